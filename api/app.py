@@ -7,6 +7,7 @@ from flask_cors import CORS
 
 from config import settings
 from db import database
+from api.json_provider import HAS_ORJSON, OrjsonProvider
 from api.middleware.error_handler import register_error_handlers
 from api.routes.jobs import jobs_bp
 from api.routes.health import health_bp
@@ -21,8 +22,15 @@ def create_app() -> Flask:
         static_url_path=''
     )
     app.config["SEND_FILE_MAX_AGE_DEFAULT"] = timedelta(days=1)
-
-    CORS(app)
+    if HAS_ORJSON:
+        app.json = OrjsonProvider(app)
+
+    # Only the JSON APIs are called cross-origin; browsers may cache preflights for a day.
+    CORS(
+        app,
+        resources={r"/v1/*": {"origins": "*"}, r"/mekarirag/api/*": {"origins": "*"}},
+        max_age=86400,
+    )
 
     database.init_db()
 
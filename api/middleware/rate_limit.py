@@ -1,50 +1,144 @@
 """Rate limiting middleware."""
-from functools import wraps
+import logging
+import threading
+import time
+import uuid
+from collections import deque
 
-from flask import request, jsonify
+from flask import g, request, jsonify
 
 from config import settings
-from db import queries
 from api.validators import hash_ip
 
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+# Rolling-window limiter: drop entries older than the window, count what is
+# left, and record this request only when it fits under the limit.
+_SLIDING_WINDOW_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+    return {1, count + 1}
+end
+return {0, count}
+"""
+
+_redis_client = None
+_sliding_window = None
+
+# Process-local rolling window for single-instance deployments.
+_local_windows: dict[str, deque] = {}
+_local_lock = threading.Lock()
+_LOCAL_WINDOW_MAX_KEYS = 10000
+
+
+def _get_sliding_window():
+    """Return the registered Redis limiter script, or None when unavailable."""
+    global _redis_client, _sliding_window
+    if not HAS_REDIS or not settings.REDIS_URL:
+        return None
+    if _sliding_window is None:
+        pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+        _redis_client = redis.Redis(connection_pool=pool)
+        _sliding_window = _redis_client.register_script(_SLIDING_WINDOW_LUA)
+    return _sliding_window
+
+
+def _check_local_window(ip_hash: str) -> tuple[bool, int]:
+    """Apply the rolling-window limit using in-process state only."""
+    now = time.monotonic()
+    cutoff = now - settings.RATE_LIMIT_WINDOW_SECONDS
+    with _local_lock:
+        if len(_local_windows) > _LOCAL_WINDOW_MAX_KEYS:
+            for key in [k for k, w in _local_windows.items() if not w or w[-1] <= cutoff]:
+                del _local_windows[key]
+        window = _local_windows.setdefault(ip_hash, deque())
+        while window and window[0] <= cutoff:
+            window.popleft()
+        if len(window) < settings.JOB_CREATIONS_PER_IP:
+            window.append(now)
+            return True, len(window)
+        return False, len(window)
+
 
 def get_client_ip() -> str:
-    """Extract the client IP from the request."""
-    if request.headers.get('X-Forwarded-For'):
-        return request.headers.get('X-Forwarded-For').split(',')[0].strip()
-    if request.headers.get('X-Real-IP'):
-        return request.headers.get('X-Real-IP').strip()
-    return request.remote_addr or '127.0.0.1'
+    """Extract the client IP from the request, memoized per request on `g`."""
+    ip = g.get('client_ip')
+    if ip:
+        return ip
+    forwarded_for = request.headers.get('X-Forwarded-For')
+    if forwarded_for:
+        ip = forwarded_for.split(',', 1)[0].strip()
+    else:
+        ip = request.headers.get('X-Real-IP', '').strip()
+    ip = ip or request.remote_addr or '127.0.0.1'
+    g.client_ip = ip
+    return ip
 
 
-def check_rate_limit(ip_hash: str) -> tuple[bool, int]:
+def check_rate_limit(ip_hash: str) -> tuple[bool, int, str]:
     """
     Check if the IP is within rate limits.
     
+    Each IP may create JOB_CREATIONS_PER_IP jobs per RATE_LIMIT_WINDOW_SECONDS,
+    counted in Redis when REDIS_URL is configured, or in-process when
+    USE_LOCAL_RATELIMIT is set. With neither backend every request is allowed
+    without touching storage.
+    
     Returns:
-        (is_allowed, current_count)
+        (is_allowed, current_count, limit_description)
     """
-    current_count = queries.get_ip_concurrent_count(ip_hash)
-    is_allowed = current_count < settings.CONCURRENT_JOBS_PER_IP
-    return is_allowed, current_count
-
-
-def rate_limit_required(f):
-    """Decorator to enforce rate limiting on job creation."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        ip = get_client_ip()
-        ip_hash = hash_ip(ip)
-        
-        is_allowed, current_count = check_rate_limit(ip_hash)
-        
-        if not is_allowed:
-            return jsonify({
-                "error": "Rate limit exceeded",
-                "message": f"Maximum {settings.CONCURRENT_JOBS_PER_IP} concurrent jobs allowed per IP",
-                "current_jobs": current_count
-            }), 429
-        
-        return f(*args, **kwargs)
+    limit_description = (
+        f"Maximum {settings.JOB_CREATIONS_PER_IP} new jobs per "
+        f"{settings.RATE_LIMIT_WINDOW_SECONDS} seconds allowed per IP"
+    )
+    script = _get_sliding_window()
+    if script is not None:
+        try:
+            allowed, count = script(
+                keys=[f"ratelimit:{ip_hash}"],
+                args=[
+                    time.time(),
+                    settings.RATE_LIMIT_WINDOW_SECONDS,
+                    settings.JOB_CREATIONS_PER_IP,
+                    uuid.uuid4().hex,
+                ],
+            )
+            return bool(allowed), int(count), limit_description
+        except redis.RedisError as e:
+            logger.warning(f"Redis rate limiter unavailable, using fallback: {e}")
+
+    if settings.USE_LOCAL_RATELIMIT:
+        is_allowed, current_count = _check_local_window(ip_hash)
+        return is_allowed, current_count, limit_description
+
+    return True, 0, limit_description
+
+
+def enforce_rate_limit():
+    """
+    Apply the per-IP job creation limit to the current request.
+    
+    Called by job-creating routes once the request body is valid, so
+    rejected requests do not use up the caller's quota.
     
-    return decorated_function
+    Returns:
+        A 429 response when the limit is exceeded, otherwise None.
+    """
+    ip_hash = hash_ip(get_client_ip())
+    is_allowed, current_count, limit_description = check_rate_limit(ip_hash)
+    if is_allowed:
+        return None
+    return jsonify({
+        "error": "Rate limit exceeded",
+        "message": limit_description,
+        "current_jobs": current_count
+    }), 429
@@ -11,7 +11,7 @@ from urllib.parse import urlparse
 from playwright.sync_api import sync_playwright
 
 from config import settings
-from crawler.blocking_signals import detect_captcha, detect_waf
+from crawler.blocking_signals import detect_blocking
 
 
 ARTICLE_PATH_PATTERN = re.compile(r"(\/articles\/|\/sections\/|\/categories\/|\/docs\/|\/guide\/|\/help\/)")
@@ -191,14 +191,8 @@ def _prepare_page_for_capture(page) -> None:
 
 def blocking_signals(html: str) -> list[str]:
     """Return detected blocking signals for rendered HTML."""
-    signals: list[str] = []
-    is_captcha, captcha_patterns = detect_captcha(html)
-    if is_captcha:
-        signals.extend(captcha_patterns)
-    is_waf, waf_patterns = detect_waf(html)
-    if is_waf:
-        signals.extend(waf_patterns)
-    return sorted(set(signals))
+    captcha_patterns, waf_patterns = detect_blocking(html)
+    return sorted(set(captcha_patterns + waf_patterns))
 
 
 def _read_metadata(path: str) -> dict:
@@ -1,11 +1,19 @@
 """MVP job and page routes."""
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
-from flask import Blueprint, abort, jsonify, request, send_file
+from flask import Blueprint, Response, abort, jsonify, request, send_file, stream_with_context
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
 
+from api.middleware.rate_limit import enforce_rate_limit
 from api.preview_capture import ensure_page_screenshot
 from api.validators import (
     generate_job_id,
@@ -20,12 +28,18 @@ from api.validators import (
 from config import settings
 from config.constants import ArtifactKind, JobState
 from crawler.url_utils import get_path
-from db import queries
+from db import job_notify, queries
 from worker.job_artifacts import build_page_json_record, ensure_artifact
 
 
 jobs_bp = Blueprint("jobs", __name__)
 
+logger = logging.getLogger(__name__)
+
+# Filesystem setup for new jobs runs off the request thread; the worker's
+# start_job creates the job directory itself if it gets there first.
+_job_setup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-setup")
+
 
 @jobs_bp.route("/v1/jobs", methods=["POST"])
 def create_job():
@@ -61,10 +75,11 @@ def create_job():
     if not allowed_path_prefix and mode == "crawl":
         allowed_path_prefix = _derive_allowed_path_prefix(start_url)
 
-    job_id = generate_job_id()
-    os.makedirs(os.path.join(settings.JOBS_OUTPUT_DIR, job_id), exist_ok=True)
-    os.makedirs(os.path.join(settings.JOBS_OUTPUT_DIR, job_id, "state"), exist_ok=True)
+    rate_limited = enforce_rate_limit()
+    if rate_limited is not None:
+        return rate_limited
 
+    job_id = generate_job_id()
     job = queries.create_crawl_job(
         job_id=job_id,
         start_url=start_url,
@@ -76,6 +91,7 @@ def create_job():
         timeout_seconds=timeout_seconds,
         mode=mode,
     )
+    _submit_job_setup(job_id)
     return jsonify(_serialize_job(job)), 201
 
 
@@ -91,11 +107,70 @@ def list_jobs():
 
 @jobs_bp.route("/v1/jobs/<job_id>", methods=["GET"])
 def get_job(job_id: str):
-    """Get one job."""
+    """Get one job.
+
+    With `?wait=N` the request long-polls for up to N seconds (capped at
+    LONG_POLL_MAX_SECONDS) until the job leaves the state given in `?status=`,
+    or its current state when omitted.
+
+    Jobs whose `elapsed_seconds` is fixed (not started, or finished) carry a
+    weak ETag and a matching `If-None-Match` gets a 304. A started job's
+    elapsed time moves every second, so it is sent with `no-cache` and no
+    ETag rather than letting a 304 freeze the client's elapsed time and ETA.
+    """
+    job = queries.get_crawl_job_expiring(job_id)
+    if not job:
+        return jsonify({"error": "Not Found", "message": "Job not found"}), 404
+
+    wait = min(_parse_int(request.args.get("wait"), 0), settings.LONG_POLL_MAX_SECONDS)
+    if wait > 0 and job["status"] not in JobState.TERMINAL:
+        known_status = request.args.get("status") or job["status"]
+        if job_notify.wait_for_state_change(job_id, known_status, wait) != job["status"]:
+            job = queries.get_crawl_job(job_id)
+            if not job:
+                return jsonify({"error": "Not Found", "message": "Job not found"}), 404
+
+    if job.get("started_at") and not job.get("finished_at"):
+        response = jsonify(_serialize_job(job))
+        response.cache_control.no_cache = True
+        return response
+
+    etag = _job_etag(job)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(_serialize_job(job))
+    response.set_etag(etag, weak=True)
+    return response
+
+
+@jobs_bp.route("/v1/jobs/<job_id>/events", methods=["GET"])
+def stream_job_events(job_id: str):
+    """Stream job state changes as server-sent events."""
     job = queries.get_crawl_job(job_id)
     if not job:
         return jsonify({"error": "Not Found", "message": "Job not found"}), 404
-    return jsonify(_serialize_job(job))
+
+    def generate(status: str | None):
+        deadline = time.monotonic() + settings.JOB_EVENTS_MAX_STREAM_SECONDS
+        yield _sse_event(job_id, status)
+        while status not in JobState.TERMINAL and time.monotonic() < deadline:
+            new_status = job_notify.wait_for_state_change(
+                job_id, status, settings.JOB_EVENTS_HEARTBEAT_SECONDS
+            )
+            if new_status is None:
+                return
+            if new_status == status:
+                yield ": keepalive\n\n"
+                continue
+            status = new_status
+            yield _sse_event(job_id, status)
+
+    return Response(
+        stream_with_context(generate(job["status"])),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @jobs_bp.route("/v1/jobs/<job_id>/delete", methods=["POST"])
@@ -128,10 +203,11 @@ def retry_job(job_id: str):
     if not job:
         return jsonify({"error": "Not Found", "message": "Job not found"}), 404
 
-    new_job_id = generate_job_id()
-    os.makedirs(os.path.join(settings.JOBS_OUTPUT_DIR, new_job_id), exist_ok=True)
-    os.makedirs(os.path.join(settings.JOBS_OUTPUT_DIR, new_job_id, "state"), exist_ok=True)
+    rate_limited = enforce_rate_limit()
+    if rate_limited is not None:
+        return rate_limited
 
+    new_job_id = generate_job_id()
     new_job = queries.create_crawl_job(
         job_id=new_job_id,
         start_url=job["start_url"],
@@ -142,6 +218,7 @@ def retry_job(job_id: str):
         ignore_path_prefixes=job.get("ignore_path_prefixes") or [],
         timeout_seconds=job.get("timeout_seconds", settings.DEFAULT_TIMEOUT_SECONDS),
     )
+    _submit_job_setup(new_job_id)
     return jsonify(_serialize_job(new_job)), 201
 
 
@@ -192,7 +269,7 @@ def list_pages(job_id: str):
     limit = _parse_int(request.args.get("limit"), 100)
     offset = _parse_int(request.args.get("offset"), 0)
 
-    pages = queries.list_pages_for_job(
+    pages = queries.list_page_summaries_for_job(
         job_id,
         depth=depth,
         parent_page_id=parent_page_id,
@@ -301,36 +378,114 @@ def _download_artifact(job_id: str, kind: str, mimetype: str):
         ensure_artifact(job_id, kind, force_refresh=True)
 
     artifact = queries.get_artifact_by_kind(job_id, kind)
-    if not artifact or not os.path.exists(artifact["path"]):
+    response = _artifact_response(artifact, mimetype)
+    if response is None:
         try:
             ensure_artifact(job_id, kind)
         except ValueError:
             return jsonify({"error": "Not Found", "message": "Artifact not found"}), 404
         artifact = queries.get_artifact_by_kind(job_id, kind)
-        if not artifact or not os.path.exists(artifact["path"]):
+        response = _artifact_response(artifact, mimetype)
+        if response is None:
             return jsonify({"error": "Not Found", "message": "Artifact not found"}), 404
 
+    response.cache_control.no_store = True
+    response.cache_control.max_age = 0
+    response.expires = 0
+    return response
+
+
+def _artifact_response(artifact: dict | None, mimetype: str) -> Response | None:
+    """Serve an artifact file, or return None if it is missing."""
+    if not artifact:
+        return None
+    path = artifact["path"]
+    if settings.USE_XACCEL:
+        if not os.path.isfile(path):
+            return None
+        response = _xaccel_response(path, mimetype)
+        if response is not None:
+            return response
+
+    try:
+        handle = open(path, "rb")
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    # The file is opened once and stat'd through its descriptor. send_file
+    # cannot size or date a file object, so the validators and Range
+    # handling it would derive from a path are applied here.
+    stat = os.fstat(handle.fileno())
     response = send_file(
-        artifact["path"],
+        handle,
         mimetype=mimetype,
         as_attachment=True,
-        download_name=os.path.basename(artifact["path"]),
+        download_name=os.path.basename(path),
+        last_modified=stat.st_mtime,
+        etag=f"{stat.st_mtime}-{stat.st_size}",
+        conditional=False,
     )
-    response.cache_control.no_store = True
-    response.cache_control.max_age = 0
-    response.expires = 0
+    response.content_length = stat.st_size
+    try:
+        return response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+    except RequestedRangeNotSatisfiable:
+        handle.close()
+        raise
+
+
+def _submit_job_setup(job_id: str) -> None:
+    """Create a new job's output directory on the setup executor."""
+    future = _job_setup_executor.submit(_prepare_job_dir, job_id)
+    future.add_done_callback(functools.partial(_log_job_setup_failure, job_id))
+
+
+def _prepare_job_dir(job_id: str) -> None:
+    """Create the output directory for a new job."""
+    os.makedirs(os.path.join(settings.JOBS_OUTPUT_DIR, job_id), exist_ok=True)
+
+
+def _log_job_setup_failure(job_id: str, future) -> None:
+    """Log a failed job setup, which would otherwise vanish with its future."""
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Failed to create output directory for job {job_id}: {error}")
+
+
+def _xaccel_response(path: str, mimetype: str) -> Response | None:
+    """Let nginx serve a job output file, or return None to stream it ourselves."""
+    if not settings.USE_XACCEL:
+        return None
+    relative_path = os.path.relpath(os.path.realpath(path), os.path.realpath(settings.JOBS_OUTPUT_DIR))
+    if relative_path.startswith(os.pardir):
+        return None
+    response = Response(mimetype=mimetype)
+    response.headers["X-Accel-Redirect"] = f"{settings.XACCEL_JOBS_PREFIX}/{relative_path}"
+    response.headers.set("Content-Disposition", "attachment", filename=os.path.basename(path))
     return response
 
 
+def _sse_event(job_id: str, status: str | None) -> str:
+    """Format one server-sent event for a job state."""
+    return f"event: status\ndata: {json.dumps({'job_id': job_id, 'status': status})}\n\n"
+
+
+@functools.lru_cache(maxsize=4096)
+def _epoch_seconds(timestamp: str) -> float:
+    """Parse a stored ISO timestamp once; polling re-reads the same values."""
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
 def _serialize_job(job: dict) -> dict:
     """Serialize a job for detail responses."""
     started_at = job.get("started_at")
     finished_at = job.get("finished_at")
     elapsed_seconds = None
     if started_at:
-        start_dt = datetime.fromisoformat(started_at)
-        end_dt = datetime.fromisoformat(finished_at) if finished_at else datetime.now(timezone.utc)
-        elapsed_seconds = int((end_dt - start_dt).total_seconds())
+        start_ts = _epoch_seconds(started_at)
+        end_ts = _epoch_seconds(finished_at) if finished_at else time.time()
+        elapsed_seconds = int(end_ts - start_ts)
 
     response = {
         "job_id": job["id"],
@@ -358,6 +513,25 @@ def _serialize_job(job: dict) -> dict:
     return response
 
 
+def _job_etag(job: dict) -> str:
+    """Weak ETag over the job fields that change as a crawl progresses.
+
+    Only used while elapsed_seconds is fixed, which the timestamps cover.
+    """
+    key = "|".join(str(job.get(field)) for field in (
+        "status",
+        "pages_discovered",
+        "pages_processed",
+        "pages_succeeded",
+        "pages_failed",
+        "cleanup_status",
+        "error_message",
+        "started_at",
+        "finished_at",
+    ))
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
 def _serialize_job_summary(job: dict) -> dict:
     """Serialize a compact job summary."""
     return {
@@ -372,7 +546,9 @@ def _serialize_job_summary(job: dict) -> dict:
 
 def _serialize_page_summary(page: dict) -> dict:
     """Serialize a compact page response."""
-    text_length = len(page.get("plain_text") or page.get("raw_text") or "")
+    text_length = page.get("text_length")
+    if text_length is None:
+        text_length = len(page.get("plain_text") or page.get("raw_text") or "")
     return {
         "page_id": page["id"],
         "url": page["url"],
@@ -79,6 +79,7 @@ class ExtractionMode:
     TRAFILATURA = "trafilatura"
     READABILITY = "readability"
     FALLBACK = "fallback"
+    DUPLICATE_SKIPPED = "duplicate_skipped"
 
 
 class ArtifactKind:
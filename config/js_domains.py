@@ -42,24 +42,61 @@ JS_PATH_PATTERNS = [
 ]
 
 
-def _matches_pattern(hostname: str, pattern: str) -> bool:
-    """Check if hostname matches a glob-style pattern."""
-    # Convert glob pattern to regex
-    # *.example.com should match sub.example.com but not example.com
-    if pattern.startswith('*.'):
-        # Match any subdomain
-        base = pattern[2:]
-        return hostname.endswith('.' + base) or hostname == base
-    elif pattern.endswith('.*'):
-        # Match any TLD
-        base = pattern[:-2]
-        return hostname.startswith(base + '.') or hostname == base
-    elif '*' in pattern:
-        # General glob matching
-        return fnmatch.fnmatch(hostname, pattern)
-    else:
-        # Exact match
-        return hostname == pattern
+def _build_domain_index(patterns: list[str]):
+    """
+    Partition glob-style domain patterns for constant-time lookup.
+    
+    `*.example.com` matches sub.example.com and example.com itself, so those
+    bases go into a suffix map probed once per hostname label. Exact hosts go
+    into a dict, and anything else is folded into one union regex whose named
+    groups identify the pattern that matched.
+    """
+    exact: dict[str, str] = {}
+    suffixes: dict[str, str] = {}
+    alternatives = []
+    glob_patterns: dict[str, str] = {}
+    for pattern in patterns:
+        if pattern.startswith('*.'):
+            suffixes.setdefault(pattern[2:], pattern)
+            continue
+        if pattern.endswith('.*'):
+            # Match any TLD
+            regex = re.escape(pattern[:-2]) + r'(?:\..*)?\Z'
+        elif '*' in pattern:
+            # General glob matching
+            regex = fnmatch.translate(pattern)
+        else:
+            exact.setdefault(pattern, pattern)
+            continue
+        group = f"p{len(alternatives)}"
+        glob_patterns[group] = pattern
+        alternatives.append(f"(?P<{group}>{regex})")
+    glob_re = re.compile("|".join(alternatives), re.DOTALL) if alternatives else None
+    return exact, suffixes, glob_re, glob_patterns
+
+
+_EXACT_DOMAINS, _SUFFIX_DOMAINS, _GLOB_DOMAIN_RE, _GLOB_DOMAIN_PATTERNS = _build_domain_index(JS_DOMAIN_PATTERNS)
+
+
+def _match_domain_pattern(hostname: str) -> str | None:
+    """Return the JS_DOMAIN_PATTERNS entry matching hostname, if any."""
+    pattern = _EXACT_DOMAINS.get(hostname)
+    if pattern:
+        return pattern
+
+    # Probe the hostname and each parent domain against the `*.` bases.
+    candidate = hostname
+    while candidate:
+        pattern = _SUFFIX_DOMAINS.get(candidate)
+        if pattern:
+            return pattern
+        _, _, candidate = candidate.partition('.')
+
+    if _GLOB_DOMAIN_RE is not None:
+        match = _GLOB_DOMAIN_RE.match(hostname)
+        if match:
+            return _GLOB_DOMAIN_PATTERNS[match.lastgroup]
+    return None
 
 
 def is_js_heavy_domain(url: str) -> bool:
@@ -81,9 +118,8 @@ def is_js_heavy_domain(url: str) -> bool:
         hostname = hostname.lower()
         
         # Check domain patterns
-        for pattern in JS_DOMAIN_PATTERNS:
-            if _matches_pattern(hostname, pattern):
-                return True
+        if _match_domain_pattern(hostname):
+            return True
         
         # Check path patterns (some sites use specific paths for JS content)
         path = parsed.path.lower()
@@ -118,9 +154,9 @@ def get_detected_reason(url: str) -> str | None:
         
         hostname = hostname.lower()
         
-        for pattern in JS_DOMAIN_PATTERNS:
-            if _matches_pattern(hostname, pattern):
-                return f"domain_pattern:{pattern}"
+        pattern = _match_domain_pattern(hostname)
+        if pattern:
+            return f"domain_pattern:{pattern}"
         
         path = parsed.path.lower()
         for path_pattern in JS_PATH_PATTERNS:
@@ -1,5 +1,6 @@
 """Global settings for the crawler application."""
 import os
+import re
 
 # Base paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -25,8 +26,19 @@ ORPHANED_THRESHOLD_SECONDS = 120
 STALLED_THRESHOLD_SECONDS = 300
 HARD_STALLED_THRESHOLD_SECONDS = 900
 
-# Rate limiting
-CONCURRENT_JOBS_PER_IP = 5
+# Job status long-poll / event stream. Each waiting client holds a server
+# thread, so gunicorn runs gthread workers (see Procfile) whose timeout is
+# well above these holds.
+LONG_POLL_MAX_SECONDS = int(os.environ.get("LONG_POLL_MAX_SECONDS", "30"))
+JOB_EVENTS_HEARTBEAT_SECONDS = 15
+JOB_EVENTS_MAX_STREAM_SECONDS = 300
+
+# Rate limiting: new jobs per IP within each rolling window. Enforced only
+# when REDIS_URL or USE_LOCAL_RATELIMIT provides a window backend.
+JOB_CREATIONS_PER_IP = int(os.environ.get("JOB_CREATIONS_PER_IP", "20"))
+RATE_LIMIT_WINDOW_SECONDS = int(os.environ.get("RATE_LIMIT_WINDOW_SECONDS", "3600"))
+REDIS_URL = os.environ.get("REDIS_URL", "")
+USE_LOCAL_RATELIMIT = os.environ.get("USE_LOCAL_RATELIMIT", "0") == "1"
 
 # Job defaults and limits
 DEFAULT_MAX_PAGES = 250
@@ -43,6 +55,10 @@ MIN_TIMEOUT_SECONDS = 60
 
 MAX_OUTPUT_BYTES = 100 * 1024 * 1024  # 100MB
 
+# Artifact downloads: hand file transfer to nginx via X-Accel-Redirect
+USE_XACCEL = os.environ.get("USE_XACCEL", "0") == "1"
+XACCEL_JOBS_PREFIX = os.environ.get("XACCEL_JOBS_PREFIX", "/_protected/jobs")
+
 # Job retention
 JOB_EXPIRY_HOURS = 24
 
@@ -54,8 +70,18 @@ CRAWLER_CONCURRENT_REQUESTS = 128
 CRAWLER_DOWNLOAD_DELAY = 0.02
 CRAWLER_DEPTH_LIMIT = 20
 CRAWLER_USER_AGENT = "SkrappBot/1.0 (docs crawler)"
+# Entries per memoized URL helper (canonicalization, parsing, per-crawl scope checks)
+URL_CACHE_SIZE = int(os.environ.get("URL_CACHE_SIZE", "100000"))
+# Per-job Bloom filter in front of the url_queue duplicate lookups
+FRONTIER_BLOOM_CAPACITY = int(os.environ.get("FRONTIER_BLOOM_CAPACITY", "1000000"))
+FRONTIER_BLOOM_ERROR_RATE = float(os.environ.get("FRONTIER_BLOOM_ERROR_RATE", "0.001"))
 PLAYWRIGHT_DISCOVERY_WAIT_MS = int(os.environ.get("PLAYWRIGHT_DISCOVERY_WAIT_MS", "2000"))
 PLAYWRIGHT_PAGE_TIMEOUT_MS = int(os.environ.get("PLAYWRIGHT_PAGE_TIMEOUT_MS", "45000"))
+# Pages rendered at once by the Playwright crawler, each on its own tab
+PLAYWRIGHT_CRAWL_CONCURRENCY = int(os.environ.get("PLAYWRIGHT_CRAWL_CONCURRENCY", "4"))
+# Processes running the Playwright crawler's extraction cascade; 1 or less
+# extracts on a thread in the crawler process
+PLAYWRIGHT_EXTRACTION_PROCESSES = int(os.environ.get("PLAYWRIGHT_EXTRACTION_PROCESSES", str(os.cpu_count() or 1)))
 PREVIEW_SCREENSHOT_TIMEOUT_MS = int(os.environ.get("PREVIEW_SCREENSHOT_TIMEOUT_MS", "30000"))
 PREVIEW_SCREENSHOT_EXTRA_WAIT_MS = int(os.environ.get("PREVIEW_SCREENSHOT_EXTRA_WAIT_MS", "12000"))
 PREVIEW_SCREENSHOT_WIDTH = int(os.environ.get("PREVIEW_SCREENSHOT_WIDTH", "1440"))
@@ -83,6 +109,8 @@ DUPLICATE_HASH_THRESHOLD = 0.50  # 50% duplicate content
 
 # Text extraction
 MIN_TEXT_LENGTH_SUCCESS = 200
+# Extractor results kept per process for pages with identical HTML (0 disables)
+EXTRACTOR_CACHE_SIZE = int(os.environ.get("EXTRACTOR_CACHE_SIZE", "256"))
 
 # Excluded file extensions
 EXCLUDED_EXTENSIONS = {
@@ -94,3 +122,9 @@ EXCLUDED_EXTENSIONS = {
     '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.webm',
     '.exe', '.dmg', '.pkg', '.deb', '.rpm',
 }
+
+# Same set as one case-insensitive path-suffix regex for per-URL filtering
+EXCLUDED_EXTENSIONS_RE = re.compile(
+    r'\.(?:' + '|'.join(sorted((re.escape(ext[1:]) for ext in EXCLUDED_EXTENSIONS), key=len, reverse=True)) + r')\Z',
+    re.IGNORECASE,
+)
@@ -0,0 +1,82 @@
+"""Line-level text loops: the ContentCleanupPipeline filter and the quality
+scorer's duplicate-line count.
+
+The module has no Scrapy or pipeline dependencies and is fully annotated so
+it can be compiled with mypyc (``mypyc crawler/_cleanup.py``); the compiled
+extension is picked up automatically and the source runs unchanged otherwise.
+"""
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+
+def clean_lines(content: str, remove_re: re.Pattern, candidates: Optional[set[int]]) -> str:
+    """
+    Drop boilerplate lines, collapse blank runs and repeated lines.
+    
+    Args:
+        content: Text or markdown to clean
+        remove_re: Pattern matched against each stripped line
+        candidates: Indexes of lines that may match remove_re, or None to
+            test every line
+    """
+    cleaned_lines: list[str] = []
+    prev_line: Optional[str] = None
+    index = -1
+    
+    # The split list is released when the loop ends, before the join, and the
+    # kept lines are shared with it; walking the content with str.find
+    # measured twice as slow without lowering peak memory.
+    for line in content.split('\n'):
+        index += 1
+        stripped = line.strip()
+        
+        # Skip empty lines (but allow one)
+        if not stripped:
+            if prev_line != '':
+                cleaned_lines.append('')
+            prev_line = ''
+            continue
+        
+        # Skip lines matching boilerplate patterns
+        if (candidates is None or index in candidates) and remove_re.match(stripped):
+            continue
+        
+        # Skip duplicate consecutive lines (common extraction bug)
+        if stripped == prev_line and len(stripped) > 20:
+            continue
+        
+        cleaned_lines.append(line)
+        prev_line = stripped
+    
+    # Remove trailing empty lines
+    while cleaned_lines and not cleaned_lines[-1].strip():
+        cleaned_lines.pop()
+    
+    # Remove leading empty lines
+    while cleaned_lines and not cleaned_lines[0].strip():
+        cleaned_lines.pop(0)
+    
+    return '\n'.join(cleaned_lines)
+
+
+def detect_duplicate_lines(text: str) -> Tuple[int, int]:
+    """
+    Detect duplicate consecutive lines (common in bad extractions).
+    Returns (duplicate_count, total_lines).
+    """
+    # One pass, stripping each line once and keeping no list of lines
+    duplicates = 0
+    total_lines = 0
+    prev_line: Optional[str] = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        total_lines += 1
+        if line == prev_line and len(line) > 10:
+            duplicates += 1
+        prev_line = line
+    
+    return duplicates, total_lines
@@ -1,9 +1,20 @@
 """Blocking signal detection utilities."""
 from __future__ import annotations
 
+import logging
 import re
+import threading
+from collections import Counter, OrderedDict
 from typing import Any
 
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+logger = logging.getLogger(__name__)
+
 
 CAPTCHA_PATTERNS = [
     r'cf-browser-verification',
@@ -44,6 +55,138 @@ LOGIN_REDIRECT_PATTERNS = [
 ]
 
 
+_LOGIN_REDIRECT_RE = re.compile('|'.join(map(re.escape, LOGIN_REDIRECT_PATTERNS)))
+
+_META_REFRESH_RE = re.compile(
+    r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]+content=["\']?\d+;\s*url=([^"\'>\s]+)',
+    re.IGNORECASE
+)
+
+_REGEX_METACHARS = frozenset('\\.^$*+?{}[]()|')
+_LITERAL_PREFIX_RE = re.compile(r'[^\\.^$*+?{}\[\]()|]*')
+
+
+def _compile_signature(pattern: str) -> tuple[str, re.Pattern | None]:
+    """
+    Return (literal, regex) for a signature pattern.
+    
+    Plain tokens are matched with `in`, which beats the regex engine on short
+    literals. Other patterns are compiled once and only run when their
+    literal prefix is present.
+    """
+    if not _REGEX_METACHARS.intersection(pattern):
+        return pattern, None
+    prefix = _LITERAL_PREFIX_RE.match(pattern).group()
+    if pattern[len(prefix):len(prefix) + 1] in ('?', '*', '{'):
+        # The last prefix character is optional
+        prefix = prefix[:-1]
+    return prefix, re.compile(pattern)
+
+
+def _signature(kind: str, pattern: str) -> tuple[str, str, bytes, re.Pattern | None]:
+    literal, regex = _compile_signature(pattern)
+    return kind, pattern, literal.encode('ascii'), regex
+
+
+# (kind, pattern, literal bytes, regex) for every captcha and WAF signature.
+_SIGNATURES = tuple(
+    _signature(kind, pattern)
+    for kind, patterns in (("captcha", CAPTCHA_PATTERNS), ("waf", WAF_PATTERNS))
+    for pattern in patterns
+)
+
+
+def _compile_literal_database():
+    """
+    Compile every signature's literal into one Hyperscan database.
+    
+    A single scan then reports which literals occur, instead of one `in`
+    pass over the page per signature.
+    """
+    if not HAS_HYPERSCAN:
+        return None
+    literals = [literal for _, _, literal, _ in _SIGNATURES]
+    if not all(literals):
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=literals,
+            ids=list(range(len(literals))),
+            elements=len(literals),
+            flags=hyperscan.HS_FLAG_SINGLEMATCH,
+            literal=True,
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan unavailable for blocking signatures, using fallback: {e}")
+        return None
+    return database
+
+
+_LITERAL_DATABASE = _compile_literal_database()
+
+# Hyperscan scratch space cannot be shared between concurrent scans
+_scan_state = threading.local()
+
+
+def _on_literal_match(signature_id, start, end, flags, hits):
+    hits.append(signature_id)
+
+
+def _candidate_signatures(folded: bytes):
+    """Return the signatures whose literal occurs in the folded HTML, in order."""
+    if _LITERAL_DATABASE is None:
+        return [signature for signature in _SIGNATURES if signature[2] in folded]
+    scratch = getattr(_scan_state, 'scratch', None)
+    if scratch is None:
+        scratch = _scan_state.scratch = hyperscan.Scratch(_LITERAL_DATABASE)
+    hits = []
+    _LITERAL_DATABASE.scan(folded, match_event_handler=_on_literal_match, context=hits, scratch=scratch)
+    return [_SIGNATURES[i] for i in sorted(hits)]
+
+
+def _fold_case(html: str) -> bytes:
+    """
+    Lowercase HTML for signature matching, returned as UTF-8 bytes.
+    
+    The signatures are all ASCII, so folding ASCII letters in the encoded
+    bytes finds the same matches as str.lower() while skipping its Unicode
+    case mapping, which dominates the scan on non-ASCII pages.
+    """
+    if html.isascii():
+        return html.encode('ascii').lower()
+    if '\u0130' in html or '\u212a' in html:
+        # The only non-ASCII characters that lowercase to ASCII letters
+        return html.lower().encode('utf-8', 'surrogatepass')
+    return html.encode('utf-8', 'surrogatepass').lower()
+
+
+def detect_blocking(html: str) -> tuple[list[str], list[str]]:
+    """
+    Scan HTML once for captcha and WAF indicators.
+    
+    Returns:
+        (captcha_patterns, waf_patterns)
+    """
+    if not html:
+        return [], []
+    return _match_signatures(_fold_case(html))
+
+
+def _match_signatures(folded: bytes) -> tuple[list[str], list[str]]:
+    """Match captcha and WAF signatures against _fold_case() output."""
+    captcha, waf = [], []
+    text = None
+    for kind, pattern, literal, regex in _candidate_signatures(folded):
+        if regex is not None:
+            if text is None:
+                text = folded.decode('utf-8', 'surrogatepass')
+            if not regex.search(text):
+                continue
+        (captcha if kind == "captcha" else waf).append(pattern)
+    return captcha, waf
+
+
 def detect_captcha(html: str) -> tuple[bool, list[str]]:
     """
     Detect if the HTML contains captcha indicators.
@@ -51,16 +194,7 @@ def detect_captcha(html: str) -> tuple[bool, list[str]]:
     Returns:
         (is_captcha, matched_patterns)
     """
-    if not html:
-        return False, []
-    
-    html_lower = html.lower()
-    matched = []
-    
-    for pattern in CAPTCHA_PATTERNS:
-        if re.search(pattern, html_lower):
-            matched.append(pattern)
-    
+    matched = detect_blocking(html)[0]
     return len(matched) > 0, matched
 
 
@@ -71,16 +205,7 @@ def detect_waf(html: str) -> tuple[bool, list[str]]:
     Returns:
         (is_blocked, matched_patterns)
     """
-    if not html:
-        return False, []
-    
-    html_lower = html.lower()
-    matched = []
-    
-    for pattern in WAF_PATTERNS:
-        if re.search(pattern, html_lower):
-            matched.append(pattern)
-    
+    matched = detect_blocking(html)[1]
     return len(matched) > 0, matched
 
 
@@ -92,13 +217,7 @@ def detect_login_redirect(url: str | None = None, location_header: str | None =
     if not check_url:
         return False
     
-    check_url_lower = check_url.lower()
-    
-    for pattern in LOGIN_REDIRECT_PATTERNS:
-        if pattern in check_url_lower:
-            return True
-    
-    return False
+    return _LOGIN_REDIRECT_RE.search(check_url.lower()) is not None
 
 
 def detect_meta_refresh_login(html: str) -> bool:
@@ -108,11 +227,7 @@ def detect_meta_refresh_login(html: str) -> bool:
     if not html:
         return False
     
-    meta_refresh = re.search(
-        r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]+content=["\']?\d+;\s*url=([^"\'>\s]+)',
-        html,
-        re.IGNORECASE
-    )
+    meta_refresh = _META_REFRESH_RE.search(html)
     
     if meta_refresh:
         redirect_url = meta_refresh.group(1)
@@ -121,18 +236,26 @@ def detect_meta_refresh_login(html: str) -> bool:
     return False
 
 
+# Distinct page text hashes remembered for duplicate detection
+MAX_TRACKED_TEXT_HASHES = 100_000
+
+
 class BlockingSignalTracker:
     """Track blocking signals during a crawl."""
     
     def __init__(self):
-        self.status_codes: dict[int, int] = {}
+        self.status_codes: Counter[int] = Counter()
         self.total_responses = 0
         self.captcha_hits = 0
         self.waf_hits = 0
         self.login_redirects = 0
-        self.text_hashes: dict[str, int] = {}
+        # Most recently seen distinct hashes, oldest first, keyed by a 64-bit
+        # fingerprint so the tracker does not keep every hash string alive
+        self.text_hashes: OrderedDict[int, int] = OrderedDict()
+        self.text_hash_total = 0
+        self.text_hash_duplicates = 0
         self.sample_urls: list[str] = []
-        self.signature_hits: list[str] = []
+        self.signature_hits: set[str] = set()
     
     def record_response(
         self,
@@ -145,22 +268,23 @@ class BlockingSignalTracker:
         """Record a response and check for blocking signals."""
         self.total_responses += 1
         
-        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        self.status_codes[status_code] += 1
         
         if html:
-            is_captcha, patterns = detect_captcha(html)
-            if is_captcha:
+            folded = _fold_case(html)
+            captcha_patterns, waf_patterns = _match_signatures(folded)
+            if captcha_patterns:
                 self.captcha_hits += 1
-                self.signature_hits.extend(patterns)
+                self.signature_hits.update(captcha_patterns)
                 if len(self.sample_urls) < 5:
                     self.sample_urls.append(url)
             
-            is_waf, patterns = detect_waf(html)
-            if is_waf:
+            if waf_patterns:
                 self.waf_hits += 1
-                self.signature_hits.extend(patterns)
+                self.signature_hits.update(waf_patterns)
             
-            if detect_meta_refresh_login(html):
+            # Literal prefilter: almost no page carries a meta refresh
+            if b'http-equiv' in folded and detect_meta_refresh_login(html):
                 self.login_redirects += 1
         
         if location_header and detect_login_redirect(location_header=location_header):
@@ -169,7 +293,21 @@ class BlockingSignalTracker:
                 self.sample_urls.append(url)
         
         if text_hash:
-            self.text_hashes[text_hash] = self.text_hashes.get(text_hash, 0) + 1
+            self.record_text_hash(text_hash)
+    
+    def record_text_hash(self, text_hash: str):
+        """Count a page text hash for duplicate detection."""
+        self.text_hash_total += 1
+        # str hashes are SipHash-based and cached on the string; a false match
+        # among MAX_TRACKED_TEXT_HASHES entries is vanishingly unlikely.
+        key = hash(text_hash)
+        # pop + re-insert counts the hash and moves it to the newest end
+        count = self.text_hashes.pop(key, 0)
+        self.text_hashes[key] = count + 1
+        if count:
+            self.text_hash_duplicates += 1
+        elif len(self.text_hashes) > MAX_TRACKED_TEXT_HASHES:
+            self.text_hashes.popitem(last=False)
     
     def get_status_code_ratio(self, status_code: int) -> float:
         """Get the ratio of a specific status code."""
@@ -179,16 +317,10 @@ class BlockingSignalTracker:
     
     def get_duplicate_ratio(self) -> float:
         """Get the ratio of duplicate content (by text hash)."""
-        if not self.text_hashes:
-            return 0.0
-        
-        total = sum(self.text_hashes.values())
-        unique = len(self.text_hashes)
-        
-        if total == 0:
+        if self.text_hash_total == 0:
             return 0.0
         
-        return 1.0 - (unique / total)
+        return self.text_hash_duplicates / self.text_hash_total
     
     def get_evidence(self) -> dict[str, Any]:
         """Get evidence of blocking signals."""
@@ -200,5 +332,5 @@ class BlockingSignalTracker:
             "login_redirects": self.login_redirects,
             "duplicate_ratio": round(self.get_duplicate_ratio(), 3),
             "sample_urls": self.sample_urls[:5],
-            "signature_hits": list(set(self.signature_hits))[:10]
+            "signature_hits": sorted(self.signature_hits)[:10]
         }
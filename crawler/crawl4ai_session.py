@@ -14,7 +14,7 @@ from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 
 from config import settings
 from crawler.text_utils import markdown_to_text
-from crawler.url_utils import canonicalize_url, is_url_in_scope
+from crawler.url_utils import canonicalize_url, compile_ignore_prefixes, is_url_in_scope
 
 
 logger = logging.getLogger(__name__)
@@ -57,7 +57,7 @@ class Crawl4AIPageSession:
     ):
         self.allowed_host = allowed_host.lower()
         self.allowed_path_prefix = allowed_path_prefix
-        self.ignore_prefixes = ignore_prefixes or []
+        self.ignore_prefixes = compile_ignore_prefixes(ignore_prefixes)
         self._loop: asyncio.AbstractEventLoop | None = None
         self._crawler: AsyncWebCrawler | None = None
 
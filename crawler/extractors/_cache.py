@@ -0,0 +1,75 @@
+"""Shared result cache for the extractors, keyed by a hash of the HTML."""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from config import settings
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+
+_results: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def content_digest(html: str) -> bytes:
+    """Return a 128-bit digest of the HTML."""
+    data = html.encode('utf-8', 'surrogatepass')
+    if HAS_XXHASH:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def extraction_digest(html: str) -> bytes | None:
+    """Digest to pass as `digest=` to cached extractors, or None when caching is off."""
+    if not html or settings.EXTRACTOR_CACHE_SIZE <= 0:
+        return None
+    return content_digest(html)
+
+
+def cache_by_content(func):
+    """
+    Memoize an extractor on its HTML argument.
+
+    Pages that share identical HTML (error pages, CAPTCHA walls, mirrored
+    paths) are extracted once. Other arguments, such as a pre-parsed tree,
+    must not change the result and are left out of the key.
+
+    Callers running several extractors on one page pass the page's
+    extraction_digest() as `digest=`, so its HTML is hashed once rather
+    than by every call.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(html, *args, digest: bytes | None = None, **kwargs):
+        if not html or settings.EXTRACTOR_CACHE_SIZE <= 0:
+            return func(html, *args, **kwargs)
+
+        key = (name, digest or content_digest(html))
+        with _lock:
+            if key in _results:
+                _results.move_to_end(key)
+                return _results[key]
+
+        result = func(html, *args, **kwargs)
+        with _lock:
+            _results[key] = result
+            while len(_results) > settings.EXTRACTOR_CACHE_SIZE:
+                _results.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+def clear_cache() -> None:
+    """Drop all cached extractor results."""
+    with _lock:
+        _results.clear()
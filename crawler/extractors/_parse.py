@@ -0,0 +1,33 @@
+"""Shared lxml parsing for the extractors."""
+from __future__ import annotations
+
+import lxml.html
+
+
+# Extraction never looks elements up by id, so skip building the id index.
+_PARSER = lxml.html.HTMLParser(collect_ids=False)
+_UTF8_PARSER = lxml.html.HTMLParser(encoding='utf-8', collect_ids=False)
+
+
+def parse_html(html: str) -> lxml.html.HtmlElement:
+    """
+    Parse an HTML document into an lxml tree rooted at <html>.
+    
+    Raises:
+        lxml.etree.ParserError: If the document is empty
+    """
+    try:
+        return lxml.html.document_fromstring(html, parser=_PARSER)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.document_fromstring(html.encode('utf-8'), parser=_UTF8_PARSER)
+
+
+def try_parse_html(html: str) -> lxml.html.HtmlElement | None:
+    """Parse HTML for sharing across extractors, or None if it cannot be parsed."""
+    if not html:
+        return None
+    try:
+        return parse_html(html)
+    except Exception:
+        return None
@@ -2,19 +2,57 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Optional, List, Dict
 from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup, Tag
+from lxml import etree
+from lxml.html import HtmlElement
 
 
-def extract_markdown(html: str, base_url: str) -> tuple[str, List[Dict]]:
+_SECTION_TAGS = frozenset(['h1', 'h2', 'h3', 'h4'])
+_MAIN_CLASS_RE = re.compile(r'content|main|body', re.I)
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+# Common breadcrumb patterns, in priority order: aria-labelled nav, then
+# .breadcrumb, .breadcrumbs, then any class containing "breadcrumb"
+# (which also covers ol.breadcrumb and ul.breadcrumb).
+_BREADCRUMB_XPATH = etree.XPath(
+    '//nav[contains(@aria-label, "breadcrumb")] | //*[contains(@class, "breadcrumb")]'
+)
+_LINK_XPATH = etree.XPath('.//a')
+_LINK_TEXT_XPATH = etree.XPath('.//text()')
+# Elements whose own text is not page text
+_INVISIBLE_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+# Meta tags carrying a modification date, in priority order
+_MODIFIED_META = (
+    ('name', 'last-modified'),
+    ('property', 'article:modified_time'),
+    ('property', 'og:updated_time'),
+    ('name', 'date'),
+    ('name', 'dcterms.modified'),
+)
+_VISIBLE_DATE_RES = [
+    re.compile(r'(?:Last )?[Uu]pdated:?\s*(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'(?:Last )?[Mm]odified:?\s*(\d{4}-\d{2}-\d{2})'),
+]
+
+
+@lru_cache(maxsize=4096)
+def _urljoin(base_url: str, href: str) -> str:
+    """urljoin memoized across a page's repeated links and images."""
+    return urljoin(base_url, href)
+
+
+def extract_markdown(html: str, base_url: str, soup: BeautifulSoup = None) -> tuple[str, List[Dict]]:
     """
     Convert HTML to markdown, preserving links and structure.
     
     Args:
         html: The HTML content
         base_url: Base URL for resolving relative links
+        soup: Optional soup already parsed from html; it is modified in place,
+            so run breadcrumb and last-modified extraction on it first
     
     Returns:
         (markdown_text, sections) where sections is a list of {id, title, level}
@@ -23,7 +61,8 @@ def extract_markdown(html: str, base_url: str) -> tuple[str, List[Dict]]:
         return '', []
     
     try:
-        soup = BeautifulSoup(html, 'lxml')
+        if soup is None:
+            soup = BeautifulSoup(html, 'lxml')
         
         # Remove unwanted elements
         for tag in soup(['script', 'style', 'noscript', 'nav', 'header', 'footer', 
@@ -33,15 +72,13 @@ def extract_markdown(html: str, base_url: str) -> tuple[str, List[Dict]]:
         # Find main content area
         main = (soup.find('main') or 
                 soup.find('article') or 
-                soup.find(class_=re.compile(r'content|main|body', re.I)) or
+                soup.find(class_=_MAIN_CLASS_RE) or
                 soup.find('body') or
                 soup)
         
-        # Extract sections (headings with IDs)
-        sections = _extract_sections(main, base_url)
-        
-        # Convert to markdown
-        markdown = _html_to_markdown(main, base_url)
+        # Convert to markdown, collecting sections (headings with IDs) on the way
+        sections = []
+        markdown = _html_to_markdown(main, base_url, sections)
         
         # Clean up whitespace
         markdown = _clean_markdown(markdown)
@@ -52,158 +89,239 @@ def extract_markdown(html: str, base_url: str) -> tuple[str, List[Dict]]:
         return f'[Error extracting markdown: {e}]', []
 
 
-def _extract_sections(soup: Tag, base_url: str) -> List[Dict]:
-    """Extract heading sections with their anchors."""
-    sections = []
+def _collect_sections(element: Tag, base_url: str, sections: List[Dict], include_self: bool = True):
+    """Append sections for the headings in a subtree the renderer does not walk."""
+    if include_self and element.name in _SECTION_TAGS:
+        _add_section(element, base_url, sections)
+    # Plain iteration: find_all's per-call setup dominates on small subtrees
+    for node in element.descendants:
+        if node.name in _SECTION_TAGS:
+            _add_section(node, base_url, sections)
+
+
+def _add_section(heading: Tag, base_url: str, sections: List[Dict]):
+    """Append a heading section with its anchor."""
+    title = heading.get_text(strip=True)
+    if not title:
+        return
+    
+    # Get anchor ID
+    anchor_id = heading.get('id')
+    if not anchor_id:
+        # Nested anchor: the first <a id>, else the first <a name>
+        name_anchor = None
+        for anchor in heading.descendants:
+            if anchor.name != 'a':
+                continue
+            if anchor.get('id') is not None:
+                anchor_id = anchor['id']
+                break
+            if name_anchor is None and anchor.get('name') is not None:
+                name_anchor = anchor
+        else:
+            if name_anchor is not None:
+                anchor_id = name_anchor['name']
+    
+    sections.append({
+        'level': int(heading.name[1]),
+        'title': title,
+        'anchor': f'{base_url}#{anchor_id}' if anchor_id else base_url
+    })
+
+
+def _html_to_markdown(element: Tag, base_url: str, sections: List[Dict] = None) -> str:
+    """Convert an HTML element to markdown, appending h1-h4 sections if given."""
+    return _render([element], base_url, sections)
+
+
+def _process_children(element: Tag, base_url: str) -> str:
+    """Process all children of an element."""
+    return _render(element.contents, base_url)
+
+
+def _render(nodes, base_url: str, sections: List[Dict] = None) -> str:
+    """
+    Render nodes to markdown with an explicit stack instead of recursion.
     
-    for heading in soup.find_all(['h1', 'h2', 'h3', 'h4']):
-        level = int(heading.name[1])
-        title = heading.get_text(strip=True)
-        
-        # Get anchor ID
-        anchor_id = heading.get('id')
-        if not anchor_id:
-            # Check for nested anchor
-            anchor = heading.find('a', id=True)
-            if anchor:
-                anchor_id = anchor.get('id')
-            else:
-                anchor = heading.find('a', {'name': True})
-                if anchor:
-                    anchor_id = anchor.get('name')
-        
-        if title:
-            section = {
-                'level': level,
-                'title': title,
-                'anchor': f'{base_url}#{anchor_id}' if anchor_id else base_url
-            }
-            sections.append(section)
+    A handler returns finished markdown, None to render nothing, or a
+    (closer, children, child_handler) triple. The children are rendered into
+    a fresh buffer and the closer folds those parts into one string for the
+    enclosing buffer.
     
-    return sections
+    When sections is given, headings are collected in document order during
+    the same pass: subtrees a handler does not descend into are searched for
+    headings as they are reached. The top-level nodes are not sections
+    themselves.
+    """
+    nodes = list(nodes)
+    buffers: List[List[str]] = [[]]
+    stack = [(_render_node, node) for node in reversed(nodes)]
+    while stack:
+        handler, node = stack.pop()
+        if handler is None:
+            # node is the closer for the innermost buffer
+            parts = buffers.pop()
+            buffers[-1].append(node(parts))
+            continue
+        result = handler(node, base_url)
+        if result is None or isinstance(result, str):
+            if sections is not None and isinstance(node, Tag):
+                _collect_sections(node, base_url, sections,
+                                  include_self=not any(node is top for top in nodes))
+            if result is not None:
+                buffers[-1].append(result)
+            continue
+        closer, children, child_handler = result
+        buffers.append([])
+        stack.append((None, closer))
+        stack.extend((child_handler, child) for child in reversed(children))
+    return ''.join(buffers[0])
 
 
-def _html_to_markdown(element: Tag, base_url: str) -> str:
-    """Convert an HTML element to markdown."""
+def _render_node(element, base_url: str):
+    """Dispatch a node to its tag handler; unknown tags render their children."""
     if isinstance(element, str):
         return element
     
-    if not hasattr(element, 'name'):
-        return str(element)
-    
     tag = element.name
-    
-    # Handle specific tags
     if tag is None:
         # NavigableString or similar
         return element.get_text()
     
-    if tag in ['script', 'style', 'noscript']:
-        return ''
-    
-    if tag == 'br':
-        return '\n'
-    
-    if tag == 'hr':
-        return '\n---\n'
-    
-    if tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-        level = int(tag[1])
-        text = element.get_text(strip=True)
-        anchor_id = element.get('id', '')
-        if anchor_id:
-            return f'\n{"#" * level} {text} {{#{anchor_id}}}\n\n'
-        return f'\n{"#" * level} {text}\n\n'
-    
-    if tag == 'p':
-        content = _process_children(element, base_url)
-        return f'\n{content}\n'
-    
-    if tag == 'a':
-        href = element.get('href', '')
-        text = element.get_text(strip=True)
-        if href:
-            # Resolve relative URLs
-            if not href.startswith(('http://', 'https://', 'mailto:', '#')):
-                href = urljoin(base_url, href)
-            return f'[{text}]({href})'
-        return text
-    
-    if tag == 'img':
-        src = element.get('src', '')
-        alt = element.get('alt', '')
-        if src:
-            if not src.startswith(('http://', 'https://')):
-                src = urljoin(base_url, src)
-            return f'![{alt}]({src})'
-        return ''
-    
-    if tag in ['strong', 'b']:
-        content = _process_children(element, base_url)
-        return f'**{content}**'
-    
-    if tag in ['em', 'i']:
-        content = _process_children(element, base_url)
-        return f'*{content}*'
-    
-    if tag == 'code':
-        content = element.get_text()
-        if '\n' in content:
-            return f'\n```\n{content}\n```\n'
-        return f'`{content}`'
-    
-    if tag == 'pre':
-        code = element.find('code')
-        if code:
-            lang = ''
-            classes = code.get('class', [])
-            for cls in classes:
-                if cls.startswith('language-'):
-                    lang = cls[9:]
-                    break
-            content = code.get_text()
-            return f'\n```{lang}\n{content}\n```\n'
-        return f'\n```\n{element.get_text()}\n```\n'
-    
-    if tag == 'blockquote':
-        content = _process_children(element, base_url)
-        lines = content.strip().split('\n')
-        quoted = '\n'.join(f'> {line}' for line in lines)
-        return f'\n{quoted}\n'
-    
-    if tag == 'ul':
-        items = []
-        for li in element.find_all('li', recursive=False):
-            content = _process_children(li, base_url).strip()
-            items.append(f'- {content}')
-        return '\n' + '\n'.join(items) + '\n'
-    
-    if tag == 'ol':
-        items = []
-        for i, li in enumerate(element.find_all('li', recursive=False), 1):
-            content = _process_children(li, base_url).strip()
-            items.append(f'{i}. {content}')
-        return '\n' + '\n'.join(items) + '\n'
-    
-    if tag == 'table':
-        return _table_to_markdown(element, base_url)
+    handler = _TAG_HANDLERS.get(tag)
+    if handler is None:
+        return _join_parts, element.contents, _render_node
+    return handler(element, base_url)
+
+
+def _join_parts(parts: List[str]) -> str:
+    return ''.join(parts)
+
+
+def _wrap_children(prefix: str, suffix: str):
+    """Build a handler that renders children between prefix and suffix."""
+    def closer(parts: List[str]) -> str:
+        return prefix + ''.join(parts) + suffix
     
-    if tag in ['div', 'section', 'article', 'main', 'span']:
-        return _process_children(element, base_url)
+    def handler(element: Tag, base_url: str):
+        return closer, element.contents, _render_node
     
-    # Default: process children
-    return _process_children(element, base_url)
+    return handler
 
 
-def _process_children(element: Tag, base_url: str) -> str:
-    """Process all children of an element."""
-    result = []
-    for child in element.children:
-        if isinstance(child, str):
-            result.append(child)
-        elif hasattr(child, 'name'):
-            result.append(_html_to_markdown(child, base_url))
-    return ''.join(result)
+def _render_heading(element: Tag, base_url: str) -> str:
+    level = int(element.name[1])
+    text = element.get_text(strip=True)
+    anchor_id = element.get('id', '')
+    if anchor_id:
+        return f'\n{"#" * level} {text} {{#{anchor_id}}}\n\n'
+    return f'\n{"#" * level} {text}\n\n'
+
+
+def _render_link(element: Tag, base_url: str) -> str:
+    href = element.get('href', '')
+    text = element.get_text(strip=True)
+    if href:
+        # Resolve relative URLs
+        if not href.startswith(('http://', 'https://', 'mailto:', '#')):
+            href = _urljoin(base_url, href)
+        return f'[{text}]({href})'
+    return text
+
+
+def _render_image(element: Tag, base_url: str) -> str:
+    src = element.get('src', '')
+    alt = element.get('alt', '')
+    if src:
+        if not src.startswith(('http://', 'https://')):
+            src = _urljoin(base_url, src)
+        return f'![{alt}]({src})'
+    return ''
+
+
+def _render_code(element: Tag, base_url: str) -> str:
+    content = element.get_text()
+    if '\n' in content:
+        return f'\n```\n{content}\n```\n'
+    return f'`{content}`'
+
+
+def _render_pre(element: Tag, base_url: str) -> str:
+    code = element.find('code')
+    if code:
+        lang = ''
+        classes = code.get('class', [])
+        for cls in classes:
+            if cls.startswith('language-'):
+                lang = cls[9:]
+                break
+        content = code.get_text()
+        return f'\n```{lang}\n{content}\n```\n'
+    return f'\n```\n{element.get_text()}\n```\n'
+
+
+def _close_blockquote(parts: List[str]) -> str:
+    lines = ''.join(parts).strip().split('\n')
+    quoted = '\n'.join(f'> {line}' for line in lines)
+    return f'\n{quoted}\n'
+
+
+def _render_blockquote(element: Tag, base_url: str):
+    return _close_blockquote, element.contents, _render_node
+
+
+def _render_list_item(element, base_url: str):
+    """Render a list's direct <li> children; anything else is skipped."""
+    if isinstance(element, Tag) and element.name == 'li':
+        return _close_list_item, element.contents, _render_node
+    return None
+
+
+def _close_list_item(parts: List[str]) -> str:
+    return ''.join(parts).strip()
+
+
+def _close_unordered_list(items: List[str]) -> str:
+    return '\n' + '\n'.join(f'- {item}' for item in items) + '\n'
+
+
+def _close_ordered_list(items: List[str]) -> str:
+    return '\n' + '\n'.join(f'{i}. {item}' for i, item in enumerate(items, 1)) + '\n'
+
+
+def _render_unordered_list(element: Tag, base_url: str):
+    return _close_unordered_list, element.contents, _render_list_item
+
+
+def _render_ordered_list(element: Tag, base_url: str):
+    return _close_ordered_list, element.contents, _render_list_item
+
+
+def _render_empty(element: Tag, base_url: str) -> str:
+    return ''
+
+
+_TAG_HANDLERS = {
+    'script': _render_empty,
+    'style': _render_empty,
+    'noscript': _render_empty,
+    'br': lambda element, base_url: '\n',
+    'hr': lambda element, base_url: '\n---\n',
+    **{f'h{level}': _render_heading for level in range(1, 7)},
+    'p': _wrap_children('\n', '\n'),
+    'a': _render_link,
+    'img': _render_image,
+    'strong': _wrap_children('**', '**'),
+    'b': _wrap_children('**', '**'),
+    'em': _wrap_children('*', '*'),
+    'i': _wrap_children('*', '*'),
+    'code': _render_code,
+    'pre': _render_pre,
+    'blockquote': _render_blockquote,
+    'ul': _render_unordered_list,
+    'ol': _render_ordered_list,
+    'table': lambda element, base_url: _table_to_markdown(element, base_url),
+}
 
 
 def _table_to_markdown(table: Tag, base_url: str) -> str:
@@ -244,7 +362,7 @@ def _table_to_markdown(table: Tag, base_url: str) -> str:
 def _clean_markdown(text: str) -> str:
     """Clean up markdown text."""
     # Remove excessive newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _EXCESS_NEWLINES_RE.sub('\n\n', text)
     # Remove trailing whitespace from lines
     text = '\n'.join(line.rstrip() for line in text.split('\n'))
     # Remove leading/trailing whitespace
@@ -252,38 +370,58 @@ def _clean_markdown(text: str) -> str:
     return text
 
 
-def extract_breadcrumbs(soup: BeautifulSoup, base_url: str) -> List[Dict]:
+def _visible_text(tree: HtmlElement) -> str:
+    """Concatenate the document's text, leaving out script, style and template bodies."""
+    parts = []
+    # 'end', 'comment' and 'pi' events place each tail after its element's subtree
+    for event, el in etree.iterwalk(tree, events=('start', 'end', 'comment', 'pi')):
+        if event == 'start':
+            if el.text and el.tag not in _INVISIBLE_TEXT_TAGS:
+                parts.append(el.text)
+        elif el.tail and el.getparent().tag not in _INVISIBLE_TEXT_TAGS:
+            parts.append(el.tail)
+    return ''.join(parts)
+
+
+def extract_breadcrumbs(tree: HtmlElement, base_url: str) -> List[Dict]:
     """
     Extract breadcrumb navigation from the page.
     
+    Args:
+        tree: lxml tree shared with the other extractors
+        base_url: URL used to resolve relative links
+    
     Returns:
         List of {title, url} dictionaries
     """
     breadcrumbs = []
     
-    # Common breadcrumb patterns
-    bc_selectors = [
-        'nav[aria-label*="breadcrumb"]',
-        '.breadcrumb',
-        '.breadcrumbs', 
-        '[class*="breadcrumb"]',
-        'ol.breadcrumb',
-        'ul.breadcrumb',
-    ]
-    
-    bc_container = None
-    for selector in bc_selectors:
-        bc_container = soup.select_one(selector)
-        if bc_container:
-            break
-    
-    if bc_container:
-        for link in bc_container.find_all('a'):
+    # One traversal collects every candidate; pick by pattern priority
+    candidates = _BREADCRUMB_XPATH(tree)
+    bc_container = next(
+        (el for el in candidates if el.tag == 'nav' and 'breadcrumb' in el.get('aria-label', '')),
+        None
+    )
+    if bc_container is None:
+        bc_container = next(
+            (el for el in candidates if 'breadcrumb' in el.get('class', '').split()),
+            None
+        )
+    if bc_container is None:
+        bc_container = next(
+            (el for el in candidates if 'breadcrumbs' in el.get('class', '').split()),
+            None
+        )
+    if bc_container is None and candidates:
+        bc_container = candidates[0]
+    
+    if bc_container is not None:
+        for link in _LINK_XPATH(bc_container):
             href = link.get('href', '')
-            title = link.get_text(strip=True)
+            title = ''.join(s.strip() for s in _LINK_TEXT_XPATH(link))
             if title:
                 if href and not href.startswith(('http://', 'https://')):
-                    href = urljoin(base_url, href)
+                    href = _urljoin(base_url, href)
                 breadcrumbs.append({
                     'title': title,
                     'url': href or base_url
@@ -292,10 +430,14 @@ def extract_breadcrumbs(soup: BeautifulSoup, base_url: str) -> List[Dict]:
     return breadcrumbs
 
 
-def extract_last_modified(soup: BeautifulSoup, response_headers: dict = None) -> Optional[str]:
+def extract_last_modified(tree: HtmlElement, response_headers: dict = None) -> Optional[str]:
     """
     Extract last modified date from page or headers.
     
+    Args:
+        tree: lxml tree shared with the other extractors
+        response_headers: Optional HTTP response headers
+    
     Returns:
         ISO date string or None
     """
@@ -305,29 +447,18 @@ def extract_last_modified(soup: BeautifulSoup, response_headers: dict = None) ->
         if last_mod:
             return last_mod
     
-    # Check meta tags
-    meta_patterns = [
-        {'name': 'last-modified'},
-        {'property': 'article:modified_time'},
-        {'property': 'og:updated_time'},
-        {'name': 'date'},
-        {'name': 'dcterms.modified'},
-    ]
-    
-    for pattern in meta_patterns:
-        meta = soup.find('meta', pattern)
-        if meta and meta.get('content'):
+    # Check meta tags, collected in one traversal; the first tag for each
+    # pattern decides it
+    metas = list(tree.iter('meta'))
+    for attr, value in _MODIFIED_META:
+        meta = next((m for m in metas if m.get(attr) == value), None)
+        if meta is not None and meta.get('content'):
             return meta.get('content')
     
     # Check for visible dates
-    date_patterns = [
-        r'(?:Last )?[Uu]pdated:?\s*(\d{4}-\d{2}-\d{2})',
-        r'(?:Last )?[Mm]odified:?\s*(\d{4}-\d{2}-\d{2})',
-    ]
-    
-    text = soup.get_text()
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
+    text = _visible_text(tree)
+    for pattern in _VISIBLE_DATE_RES:
+        match = pattern.search(text)
         if match:
             return match.group(1)
     
@@ -2,14 +2,30 @@
 from __future__ import annotations
 
 import re
-from bs4 import BeautifulSoup
 
+from lxml import etree
 
-def extract(html: str) -> str | None:
+from crawler.extractors._cache import cache_by_content
+from crawler.extractors._parse import parse_html
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Elements whose text is never rendered
+_INVISIBLE_TAGS = frozenset(['script', 'style', 'template'])
+_SKIPPED_TAGS = _INVISIBLE_TAGS | frozenset(['noscript', 'header', 'footer', 'nav', 'aside'])
+
+
+@cache_by_content
+def extract(html: str, tree=None) -> str | None:
     """
     Extract text content from HTML by stripping all tags.
     This is the last-resort fallback extractor.
     
+    Args:
+        html: The HTML content
+        tree: Optional lxml tree already parsed from html; it is not modified
+    
     Returns:
         Extracted text or None if extraction fails
     """
@@ -17,14 +33,12 @@ def extract(html: str) -> str | None:
         return None
     
     try:
-        soup = BeautifulSoup(html, 'lxml')
-        
-        for tag in soup(['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']):
-            tag.decompose()
+        if tree is None:
+            tree = parse_html(html)
         
-        text = soup.get_text(separator=' ', strip=True)
+        text = ' '.join(_content_text(tree))
         
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         if text and text.strip():
             return text.strip()
@@ -34,10 +48,31 @@ def extract(html: str) -> str | None:
         return None
 
 
-def get_title(html: str) -> str | None:
+def _content_text(tree, skipped_tags: frozenset = _SKIPPED_TAGS) -> list[str]:
+    """Collect text outside skipped elements without modifying the tree."""
+    parts = []
+    walker = etree.iterwalk(tree, events=('start', 'end', 'comment', 'pi'))
+    for event, element in walker:
+        if event == 'start':
+            if element.tag in skipped_tags:
+                walker.skip_subtree()
+            elif element.text:
+                parts.append(element.text)
+        elif element.tail and element is not tree:
+            # Comment and processing-instruction text is skipped, their tail is not
+            parts.append(element.tail)
+    return parts
+
+
+@cache_by_content
+def get_title(html: str, tree=None) -> str | None:
     """
     Extract the title from HTML.
     
+    Args:
+        html: The HTML content
+        tree: Optional lxml tree already parsed from html
+    
     Returns:
         Title string or None if extraction fails
     """
@@ -45,15 +80,19 @@ def get_title(html: str) -> str | None:
         return None
     
     try:
-        soup = BeautifulSoup(html, 'lxml')
+        if tree is None:
+            tree = parse_html(html)
         
-        title_tag = soup.find('title')
-        if title_tag and title_tag.string:
-            return title_tag.string.strip()
+        title_tag = tree.find('.//title')
+        if title_tag is not None and title_tag.text:
+            return title_tag.text.strip()
         
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            return h1_tag.get_text(strip=True)
+        h1_tag = tree.find('.//h1')
+        if h1_tag is not None:
+            if next(h1_tag.iterancestors('template'), None) is not None:
+                # Template content is never rendered
+                return ''
+            return ''.join(text.strip() for text in _content_text(h1_tag, _INVISIBLE_TAGS))
         
         return None
     except Exception:
@@ -1,14 +1,23 @@
 """Readability text extractor."""
 from __future__ import annotations
 
+import copy
+
 from readability import Document
-from bs4 import BeautifulSoup
+
+from crawler.extractors._cache import cache_by_content
+from crawler.extractors._parse import parse_html
 
 
-def extract(html: str) -> str | None:
+@cache_by_content
+def extract(html: str, tree=None) -> str | None:
     """
     Extract text content from HTML using Readability.
     
+    Args:
+        html: The HTML content
+        tree: Optional lxml tree already parsed from html; it is not modified
+    
     Returns:
         Extracted text or None if extraction fails
     """
@@ -16,15 +25,15 @@ def extract(html: str) -> str | None:
         return None
     
     try:
-        doc = Document(html)
+        doc = _document(html, tree)
         summary_html = doc.summary()
         
         if not summary_html:
             return None
         
-        soup = BeautifulSoup(summary_html, 'lxml')
+        tree = parse_html(summary_html)
         
-        text = soup.get_text(separator=' ', strip=True)
+        text = ' '.join(filter(None, (text.strip() for text in tree.itertext())))
         
         if text and text.strip():
             return text.strip()
@@ -34,10 +43,15 @@ def extract(html: str) -> str | None:
         return None
 
 
-def get_title(html: str) -> str | None:
+@cache_by_content
+def get_title(html: str, tree=None) -> str | None:
     """
     Extract the title from HTML using Readability.
     
+    Args:
+        html: The HTML content
+        tree: Optional lxml tree already parsed from html; it is not modified
+    
     Returns:
         Title string or None if extraction fails
     """
@@ -45,7 +59,7 @@ def get_title(html: str) -> str | None:
         return None
     
     try:
-        doc = Document(html)
+        doc = _document(html, tree)
         title = doc.title()
         
         if title and title.strip():
@@ -54,3 +68,11 @@ def get_title(html: str) -> str | None:
         return None
     except Exception:
         return None
+
+
+def _document(html: str, tree=None) -> Document:
+    """Build a Readability document, reusing a parsed tree when given."""
+    if tree is None:
+        return Document(html)
+    # Readability drops hidden elements from the tree it is handed
+    return Document(copy.deepcopy(tree))
@@ -3,7 +3,10 @@ from __future__ import annotations
 
 import trafilatura
 
+from crawler.extractors._cache import cache_by_content
 
+
+@cache_by_content
 def extract(html: str) -> str | None:
     """
     Extract text content from HTML using Trafilatura.
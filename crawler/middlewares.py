@@ -2,19 +2,34 @@
 import json
 import logging
 import os
+import re
 import time
-from collections import defaultdict
 from scrapy import signals
-from scrapy.http import Response
-from scrapy.downloadermiddlewares.retry import RetryMiddleware
-from scrapy.utils.response import response_status_message
+from scrapy.http import Response, TextResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.task import deferLater
 
 from config import settings
-from crawler.blocking_signals import BlockingSignalTracker, detect_login_redirect
+from crawler.blocking_signals import BlockingSignalTracker
 
 
 logger = logging.getLogger(__name__)
 
+# Same netloc urlparse() reports, without building a ParseResult per request.
+_NETLOC_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://([^/?#]*)')
+
+
+# Characters from the start of each response scanned for blocking signals.
+# The full response.text decode is cached on the response and reused by the
+# spider, so scanning a slice of it costs no extra decode.
+_BLOCKING_SCAN_CHARS = 10000
+
+
+async def _sleep(seconds: float) -> None:
+    """Wait on the Twisted reactor, leaving other downloads running."""
+    from twisted.internet import reactor
+    await maybe_deferred_to_future(deferLater(reactor, seconds, lambda: None))
+
 
 class AdaptiveThrottleMiddleware:
     """
@@ -34,13 +49,14 @@ class AdaptiveThrottleMiddleware:
     # Circuit breaker
     FAILURE_THRESHOLD = 5  # Consecutive failures to trip breaker
     BREAKER_RESET_TIME = 300  # seconds (5 minutes)
+    MAX_REQUEST_WAIT = 5.0  # Cap on the delay applied to a single request
     
     def __init__(self):
-        # Per-host state
-        self.host_delays = defaultdict(lambda: self.INITIAL_DELAY)
-        self.host_failures = defaultdict(int)
-        self.host_breaker_until = defaultdict(float)  # Unix timestamp
-        self.host_last_request = defaultdict(float)
+        # Per-host state; hosts only get entries once there is state to keep
+        self.host_delays: dict[str, float] = {}
+        self.host_failures: dict[str, int] = {}
+        self.host_breaker_until: dict[str, float] = {}  # time.monotonic() deadline
+        self.host_last_request: dict[str, float] = {}
     
     @classmethod
     def from_crawler(cls, crawler):
@@ -52,33 +68,38 @@ class AdaptiveThrottleMiddleware:
         spider.throttle_middleware = self
     
     def _get_host(self, request):
-        """Extract host from request."""
-        from urllib.parse import urlparse
-        return urlparse(request.url).netloc.lower()
+        """Extract host (the URL netloc, lowercased) from request."""
+        match = _NETLOC_RE.match(request.url)
+        return match.group(1).lower() if match else ''
     
-    def process_request(self, request, spider):
-        """Apply adaptive delay before request."""
+    async def process_request(self, request, spider):
+        """Apply adaptive delay before request without blocking the reactor."""
         host = self._get_host(request)
+        now = time.monotonic()
         
         # Check circuit breaker
-        if time.time() < self.host_breaker_until[host]:
-            remaining = int(self.host_breaker_until[host] - time.time())
+        breaker_until = self.host_breaker_until.get(host, 0.0)
+        if now < breaker_until:
+            remaining = int(breaker_until - now)
             logger.warning(f"Host {host} circuit breaker active, {remaining}s remaining")
             # Return None to let Scrapy retry later
             request.meta['throttle_breaker'] = True
             return None
         
-        # Apply per-host delay
-        current_delay = self.host_delays[host]
+        # Apply per-host delay. The send slot is reserved before waiting so
+        # concurrent requests to the same host queue up behind each other.
+        send_at = now
+        current_delay = self.host_delays.get(host, self.INITIAL_DELAY)
         if current_delay > self.INITIAL_DELAY:
-            last_request = self.host_last_request[host]
-            elapsed = time.time() - last_request
-            if elapsed < current_delay:
-                wait_time = current_delay - elapsed
-                logger.debug(f"Throttling {host}: waiting {wait_time:.1f}s")
-                time.sleep(min(wait_time, 5.0))  # Cap sleep to avoid blocking too long
+            last_request = self.host_last_request.get(host)
+            if last_request is not None and now - last_request < current_delay:
+                wait_time = last_request + current_delay - now
+                send_at = now + min(wait_time, self.MAX_REQUEST_WAIT)
         
-        self.host_last_request[host] = time.time()
+        self.host_last_request[host] = send_at
+        if send_at > now:
+            logger.debug(f"Throttling {host}: waiting {send_at - now:.1f}s")
+            await _sleep(send_at - now)
         return None
     
     def process_response(self, request, response, spider):
@@ -88,16 +109,17 @@ class AdaptiveThrottleMiddleware:
         
         if status in (429, 503):
             # Rate limited - increase delay
-            self.host_failures[host] += 1
-            old_delay = self.host_delays[host]
+            failures = self.host_failures.get(host, 0) + 1
+            self.host_failures[host] = failures
+            old_delay = self.host_delays.get(host, self.INITIAL_DELAY)
             new_delay = min(old_delay * self.BACKOFF_FACTOR, self.MAX_DELAY)
             self.host_delays[host] = new_delay
             
             logger.warning(f"Rate limited by {host} ({status}): delay {old_delay:.1f}s -> {new_delay:.1f}s")
             
             # Check circuit breaker
-            if self.host_failures[host] >= self.FAILURE_THRESHOLD:
-                self.host_breaker_until[host] = time.time() + self.BREAKER_RESET_TIME
+            if failures >= self.FAILURE_THRESHOLD:
+                self.host_breaker_until[host] = time.monotonic() + self.BREAKER_RESET_TIME
                 logger.warning(f"Circuit breaker tripped for {host}: paused for {self.BREAKER_RESET_TIME}s")
             
             # Check Retry-After header
@@ -105,15 +127,15 @@ class AdaptiveThrottleMiddleware:
             if retry_after:
                 try:
                     retry_seconds = int(retry_after)
-                    self.host_delays[host] = max(self.host_delays[host], retry_seconds)
+                    self.host_delays[host] = max(new_delay, retry_seconds)
                     logger.info(f"Retry-After header: {retry_seconds}s for {host}")
                 except (ValueError, TypeError):
                     pass
         
         elif 200 <= status < 400:
             # Success - gradually reduce delay
-            if self.host_delays[host] > self.INITIAL_DELAY:
-                old_delay = self.host_delays[host]
+            old_delay = self.host_delays.get(host, self.INITIAL_DELAY)
+            if old_delay > self.INITIAL_DELAY:
                 new_delay = max(old_delay * self.RECOVERY_RATE, self.INITIAL_DELAY)
                 self.host_delays[host] = new_delay
                 
@@ -121,18 +143,20 @@ class AdaptiveThrottleMiddleware:
                     logger.debug(f"Reducing delay for {host}: {old_delay:.1f}s -> {new_delay:.1f}s")
             
             # Reset failure count on success
-            self.host_failures[host] = 0
+            self.host_failures.pop(host, None)
         
         return response
     
     def get_host_status(self, host: str) -> dict:
         """Get throttling status for a host."""
+        breaker_until = self.host_breaker_until.get(host, 0.0)
+        now = time.monotonic()
         return {
             'host': host,
-            'current_delay': self.host_delays[host],
-            'failure_count': self.host_failures[host],
-            'breaker_active': time.time() < self.host_breaker_until[host],
-            'breaker_remaining': max(0, int(self.host_breaker_until[host] - time.time())),
+            'current_delay': self.host_delays.get(host, self.INITIAL_DELAY),
+            'failure_count': self.host_failures.get(host, 0),
+            'breaker_active': now < breaker_until,
+            'breaker_remaining': max(0, int(breaker_until - now)),
         }
 
 
@@ -177,9 +201,9 @@ class BlockingSignalMiddleware:
         html = None
         location = None
         
-        if hasattr(response, 'text'):
+        if isinstance(response, TextResponse):
             try:
-                html = response.text[:10000]
+                html = response.text[:_BLOCKING_SCAN_CHARS]
             except Exception:
                 pass
         
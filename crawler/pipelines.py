@@ -1,29 +1,47 @@
 """Scrapy pipelines for text extraction and output."""
-import hashlib
 import json
 import logging
 import os
+import queue
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
-from bs4 import BeautifulSoup
 from scrapy.exceptions import DropItem
 
 from config import settings
 from config.constants import ExtractionMode
 from crawler.extractors import trafilatura_ext, readability_ext, plaintext_ext
 from crawler.extractors import markdown_ext
+from crawler.extractors._cache import extraction_digest
+from crawler.extractors._parse import try_parse_html
+from crawler._cleanup import clean_lines
+from crawler.text_hash import text_hash
 from crawler.quality_scorer import score_content, should_retry_extraction
 
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
 
 # Try to import frontier functions (may not exist on first run)
 try:
     from db.frontier import (
         create_document, find_document_by_content, find_document_by_url,
-        add_document_url, log_crawl_event
+        add_document_url, log_crawl_events_batch
     )
     HAS_FRONTIER = True
 except ImportError:
@@ -43,34 +61,49 @@ class TextExtractionPipeline:
             item['text_hash'] = self._compute_hash('')
             return item
         
-        text = trafilatura_ext.extract(html)
+        # Parsed once and shared by the readability and plaintext extractors,
+        # here and in later pipelines that re-run them (e.g. the quality gate).
+        # The spider hands over the tree its selector already built.
+        # Trafilatura repairs the markup itself, so it still takes the string.
+        tree = item.get('_html_tree')
+        if tree is None:
+            tree = try_parse_html(html)
+            item['_html_tree'] = tree
+        # Extractor cache key, hashed once per page for every extractor call
+        digest = extraction_digest(html)
+        item['_html_digest'] = digest
+        
+        text = trafilatura_ext.extract(html, digest=digest)
         if text and len(text.strip()) >= settings.MIN_TEXT_LENGTH_SUCCESS:
             item['text'] = text
             item['extraction_mode'] = ExtractionMode.TRAFILATURA
             item['text_hash'] = self._compute_hash(text)
-            item['title'] = item.get('title') or readability_ext.get_title(html) or plaintext_ext.get_title(html)
+            item['title'] = item.get('title') or self._get_title(html, tree, digest)
             return item
         
-        text = readability_ext.extract(html)
+        text = readability_ext.extract(html, tree, digest=digest)
         if text and len(text.strip()) >= settings.MIN_TEXT_LENGTH_SUCCESS:
             item['text'] = text
             item['extraction_mode'] = ExtractionMode.READABILITY
             item['text_hash'] = self._compute_hash(text)
-            item['title'] = item.get('title') or readability_ext.get_title(html) or plaintext_ext.get_title(html)
+            item['title'] = item.get('title') or self._get_title(html, tree, digest)
             return item
         
-        text = plaintext_ext.extract(html) or ''
+        text = plaintext_ext.extract(html, tree, digest=digest) or ''
         item['text'] = text
         item['extraction_mode'] = ExtractionMode.FALLBACK
         item['text_hash'] = self._compute_hash(text)
-        item['title'] = item.get('title') or plaintext_ext.get_title(html)
+        item['title'] = item.get('title') or plaintext_ext.get_title(html, tree, digest=digest)
         
         return item
     
+    def _get_title(self, html: str, tree, digest: bytes | None) -> str | None:
+        """Title from readability, falling back to the plain title or first h1."""
+        return readability_ext.get_title(html, tree, digest=digest) or plaintext_ext.get_title(html, tree, digest=digest)
+    
     def _compute_hash(self, text: str) -> str:
-        """Compute SHA256 hash of normalized text."""
-        normalized = ' '.join(text.lower().split())
-        return f"sha256:{hashlib.sha256(normalized.encode()).hexdigest()}"
+        """Compute the dedup hash of normalized text."""
+        return text_hash(text)
 
 
 class BlockingDetectionPipeline:
@@ -81,8 +114,7 @@ class BlockingDetectionPipeline:
         if hasattr(spider, 'blocking_tracker'):
             text_hash = item.get('text_hash')
             if text_hash:
-                spider.blocking_tracker.text_hashes[text_hash] = \
-                    spider.blocking_tracker.text_hashes.get(text_hash, 0) + 1
+                spider.blocking_tracker.record_text_hash(text_hash)
         
         return item
 
@@ -90,12 +122,26 @@ class BlockingDetectionPipeline:
 class QualityGatePipeline:
     """Pipeline to score content quality and mark low-quality pages."""
     
+    FAST_PATH_LENGTH_FACTOR = 3
+    
     def process_item(self, item, spider):
         """Score content and add quality metadata."""
         text = item.get('text', '')
         html = item.get('html', '')
         title = item.get('title', '')
         
+        # Long trafilatura extractions pass without scoring; spiders started
+        # with full_quality score every page.
+        if (
+            item.get('extraction_mode') == ExtractionMode.TRAFILATURA
+            and len(text) >= settings.MIN_TEXT_LENGTH_SUCCESS * self.FAST_PATH_LENGTH_FACTOR
+            and not getattr(spider, 'full_quality', False)
+        ):
+            item['quality_score'] = None
+            item['quality_passed'] = True
+            item['quality_reasons'] = ['fast_path']
+            return item
+        
         quality = score_content(
             text=text,
             html=html,
@@ -115,7 +161,7 @@ class QualityGatePipeline:
             if current_mode != ExtractionMode.FALLBACK and html:
                 # Try readability if we used trafilatura
                 if current_mode == ExtractionMode.TRAFILATURA:
-                    alt_text = readability_ext.extract(html)
+                    alt_text = readability_ext.extract(html, item.get('_html_tree'), digest=item.get('_html_digest'))
                     if alt_text:
                         alt_quality = score_content(text=alt_text, html=html, title=title)
                         if alt_quality.score > quality.score:
@@ -132,6 +178,30 @@ class QualityGatePipeline:
         return item
 
 
+# Byte classes covering what Python's `\s` and `\d` match inside a line of
+# UTF-8 text; every non-ASCII character encodes to bytes >= 0x80.
+_LINE_SPACE_BYTES = rb'[\t\x0b\x0c\r \x1c-\x1f\x80-\xff]'
+_DIGIT_BYTES = rb'[0-9\x80-\xff]'
+
+# Non-ASCII characters that re.IGNORECASE equates with ASCII letters
+_ASCII_CASE_EQUIVALENTS = ('\u0130', '\u0131', '\u017f', '\u212a')
+
+
+def _line_prefilter(pattern: str) -> bytes:
+    """
+    Loosen a line-start pattern into a Hyperscan expression over raw content.
+    
+    The result matches, in MULTILINE mode, every unstripped line whose
+    stripped form the original pattern matches (and possibly a few more).
+    """
+    expression = pattern.encode('utf-8')
+    if expression.startswith(b'^'):
+        expression = b'^' + _LINE_SPACE_BYTES + b'*' + expression[1:]
+    if expression.endswith(b'$'):
+        expression = expression[:-1] + _LINE_SPACE_BYTES + b'*$'
+    return expression.replace(rb'\s', _LINE_SPACE_BYTES).replace(rb'\d', _DIGIT_BYTES)
+
+
 class ContentCleanupPipeline:
     """Pipeline to clean extracted content - remove boilerplate, fix formatting."""
     
@@ -175,7 +245,53 @@ class ContentCleanupPipeline:
     ]
     
     def __init__(self):
-        self._patterns = [re.compile(p, re.IGNORECASE) for p in self.REMOVE_PATTERNS]
+        # Every pattern is anchored at the line start, so one match() of the
+        # alternation decides a line in a single regex call.
+        self._remove_re = re.compile('|'.join(f'(?:{p})' for p in self.REMOVE_PATTERNS), re.IGNORECASE)
+        self._prefilter = self._compile_prefilter()
+    
+    def _compile_prefilter(self):
+        """Compile loosened patterns into one Hyperscan database, if available."""
+        if not HAS_HYPERSCAN:
+            return None
+        expressions = [_line_prefilter(p) for p in self.REMOVE_PATTERNS]
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE,
+            )
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan unavailable for content cleanup, using fallback: {e}")
+            return None
+        return database
+    
+    def _candidate_lines(self, content: str) -> set[int] | None:
+        """
+        Return the indexes of lines that may match a boilerplate pattern.
+        
+        One Hyperscan pass over the whole content replaces a regex call per
+        line; only the returned lines are confirmed with the Python regex.
+        None means every line has to be checked.
+        """
+        if self._prefilter is None:
+            return None
+        if not content.isascii() and any(c in content for c in _ASCII_CASE_EQUIVALENTS):
+            return None
+        data = content.encode('utf-8', 'surrogatepass')
+        ends = []
+        self._prefilter.scan(data, match_event_handler=lambda i, start, end, flags, ctx: ends.append(end))
+        # A match ends at or before its line's newline, so the newlines
+        # before the end offset give the line index.
+        candidates = set()
+        line, pos = 0, 0
+        for end in sorted(ends):
+            line += data.count(b'\n', pos, end)
+            pos = end
+            candidates.add(line)
+        return candidates
     
     def process_item(self, item, spider):
         """Clean up extracted text and markdown."""
@@ -196,51 +312,26 @@ class ContentCleanupPipeline:
         if not content:
             return content
         
-        lines = content.split('\n')
-        cleaned_lines = []
-        prev_line = None
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            # Skip empty lines (but allow one)
-            if not stripped:
-                if prev_line != '':
-                    cleaned_lines.append('')
-                prev_line = ''
-                continue
-            
-            # Skip lines matching boilerplate patterns
-            skip = False
-            for pattern in self._patterns:
-                if pattern.search(stripped):
-                    skip = True
-                    break
-            
-            if skip:
-                continue
-            
-            # Skip duplicate consecutive lines (common extraction bug)
-            if stripped == prev_line and len(stripped) > 20:
-                continue
-            
-            cleaned_lines.append(line)
-            prev_line = stripped
-        
-        # Remove trailing empty lines
-        while cleaned_lines and not cleaned_lines[-1].strip():
-            cleaned_lines.pop()
-        
-        # Remove leading empty lines
-        while cleaned_lines and not cleaned_lines[0].strip():
-            cleaned_lines.pop(0)
-        
-        return '\n'.join(cleaned_lines)
+        return clean_lines(content, self._remove_re, self._candidate_lines(content))
 
 
 class DocumentIdentityPipeline:
     """Pipeline to assign document identity and track URL aliases."""
     
+    # content_hash -> document_id for documents seen in this crawl, so pages
+    # repeating known content skip the database lookup
+    MAX_CACHED_DOCUMENTS = 100_000
+    
+    def __init__(self):
+        self.doc_ids: OrderedDict[str, str] = OrderedDict()
+    
+    def _remember(self, content_hash: str, document_id: str):
+        """Record a document for its content hash, evicting the oldest entry."""
+        self.doc_ids[content_hash] = document_id
+        self.doc_ids.move_to_end(content_hash)
+        if len(self.doc_ids) > self.MAX_CACHED_DOCUMENTS:
+            self.doc_ids.popitem(last=False)
+    
     def process_item(self, item, spider):
         """Assign or find document ID based on content hash."""
         if not HAS_FRONTIER:
@@ -254,23 +345,29 @@ class DocumentIdentityPipeline:
         quality_score = item.get('quality_score')
         quality_passed = item.get('quality_passed', True)
         
-        # Extract content hash (remove sha256: prefix)
-        content_hash = text_hash.replace('sha256:', '') if text_hash else None
+        # Extract content hash (remove the sha256:/blake3: algorithm prefix)
+        content_hash = text_hash.rpartition(':')[2] if text_hash else None
         
         try:
             # Try to find existing document by content hash (deduplication)
-            existing_doc = None
+            existing_id = None
             if content_hash:
-                existing_doc = find_document_by_content(job_id, content_hash)
+                existing_id = self.doc_ids.get(content_hash)
+                if existing_id is None:
+                    existing_doc = find_document_by_content(job_id, content_hash)
+                    if existing_doc:
+                        existing_id = existing_doc['id']
+                if existing_id is not None:
+                    self._remember(content_hash, existing_id)
             
-            if existing_doc:
+            if existing_id:
                 # Same content, different URL - add as alias
-                item['document_id'] = existing_doc['id']
+                item['document_id'] = existing_id
                 item['is_duplicate'] = True
                 
                 # Add this URL as an alias
                 add_document_url(
-                    document_id=existing_doc['id'],
+                    document_id=existing_id,
                     job_id=job_id,
                     url=url,
                     canonical_url=canonical_url,
@@ -278,7 +375,7 @@ class DocumentIdentityPipeline:
                     is_primary=False
                 )
                 
-                logger.debug(f"Found duplicate content: {url} -> doc {existing_doc['id']}")
+                logger.debug(f"Found duplicate content: {url} -> doc {existing_id}")
             else:
                 # New document
                 doc = create_document(
@@ -292,6 +389,8 @@ class DocumentIdentityPipeline:
                 )
                 item['document_id'] = doc['id']
                 item['is_duplicate'] = False
+                if content_hash:
+                    self._remember(content_hash, doc['id'])
         
         except Exception as e:
             logger.warning(f"Error in document identity pipeline: {e}")
@@ -344,28 +443,47 @@ class BudgetControlPipeline:
 class CrawlLogPipeline:
     """Pipeline to log crawl events to database for debugging."""
     
+    # Events are written in batches, not one INSERT and commit per item
+    FLUSH_EVERY_ITEMS = 200
+    
+    def __init__(self):
+        self.pending_events = []
+    
+    def close_spider(self, spider):
+        """Write any events still buffered."""
+        self._flush(spider)
+    
     def process_item(self, item, spider):
         """Log crawl event to database."""
         if not HAS_FRONTIER:
             return item
         
+        self.pending_events.append({
+            'url': item.get('url', ''),
+            'canonical_url': item.get('canonical_url'),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'status_code': item.get('status_code'),
+            'stage': 'stored',
+            'extraction_mode': item.get('extraction_mode'),
+            'quality_score': item.get('quality_score'),
+            'depth': item.get('depth'),
+        })
+        if len(self.pending_events) >= self.FLUSH_EVERY_ITEMS:
+            self._flush(spider)
+        
+        return item
+    
+    def _flush(self, spider):
+        """Insert the buffered events in one batch."""
+        if not self.pending_events:
+            return
+        events, self.pending_events = self.pending_events, []
         job_id = getattr(spider, 'job_id', 'unknown')
         
         try:
-            log_crawl_event(
-                job_id=job_id,
-                url=item.get('url', ''),
-                canonical_url=item.get('canonical_url'),
-                status_code=item.get('status_code'),
-                stage='stored',
-                extraction_mode=item.get('extraction_mode'),
-                quality_score=item.get('quality_score'),
-                depth=item.get('depth'),
-            )
+            log_crawl_events_batch(job_id, events)
         except Exception as e:
-            logger.debug(f"Error logging crawl event: {e}")
-        
-        return item
+            logger.debug(f"Error logging crawl events: {e}")
 
 
 class MarkdownExtractionPipeline:
@@ -384,18 +502,23 @@ class MarkdownExtractionPipeline:
             return item
         
         try:
+            tree = item.get('_html_tree')
+            if tree is None:
+                tree = try_parse_html(html)
+            
+            # Extract breadcrumbs and last modified from the shared lxml tree
+            if tree is not None:
+                item['breadcrumbs'] = markdown_ext.extract_breadcrumbs(tree, url)
+                item['last_modified'] = markdown_ext.extract_last_modified(tree)
+            else:
+                item['breadcrumbs'] = []
+                item['last_modified'] = None
+            
             # Extract markdown with proper links
             markdown, sections = markdown_ext.extract_markdown(html, url)
             item['markdown'] = markdown
             item['sections'] = sections
             
-            # Extract breadcrumbs
-            soup = BeautifulSoup(html, 'lxml')
-            item['breadcrumbs'] = markdown_ext.extract_breadcrumbs(soup, url)
-            
-            # Extract last modified
-            item['last_modified'] = markdown_ext.extract_last_modified(soup)
-            
         except Exception as e:
             logger.warning(f"Error extracting markdown metadata: {e}")
             item['markdown'] = item.get('text', '')
@@ -406,66 +529,154 @@ class MarkdownExtractionPipeline:
         return item
 
 
+class HtmlDropPipeline:
+    """Pipeline to release the raw HTML and parsed tree once extraction is done."""
+    
+    def process_item(self, item, spider):
+        """Remove HTML from memory."""
+        item.pop('html', None)
+        item.pop('_html_tree', None)
+        item.pop('_html_digest', None)
+        return item
+
+
 class JSONLWriterPipeline:
     """Pipeline to write items to a JSONL file."""
     
+    # Lines are buffered in memory and flushed every FLUSH_EVERY_ITEMS items
+    # and on close, instead of one write+flush per page.
+    WRITE_BUFFER_BYTES = 1 << 20
+    FLUSH_EVERY_ITEMS = 512
+    # fetched_at is formatted at most once per window; items written within
+    # the same window share the timestamp.
+    TIMESTAMP_WINDOW_SECONDS = 0.1
+    # Encoded lines are handed to a writer thread so a slow disk never blocks
+    # the crawl; at most WRITE_QUEUE_SIZE lines wait in memory.
+    WRITE_QUEUE_SIZE = 1024
+    # How long a full queue is waited on before checking the writer again
+    PUT_TIMEOUT_SECONDS = 1.0
+    
     def __init__(self):
         self.file = None
         self.items_count = 0
+        self.items_since_flush = 0
+        self._ts_cache = (0.0, '')
+        self.queue = None
+        self.writer = None
+        self.write_error = None
+        self.job_id = 'unknown'
     
     def open_spider(self, spider):
         """Open the output file when the spider starts."""
         job_id = getattr(spider, 'job_id', 'unknown')
+        self.job_id = job_id
         output_dir = os.path.join(settings.JOBS_OUTPUT_DIR, job_id)
         os.makedirs(output_dir, exist_ok=True)
         
         output_path = os.path.join(output_dir, 'pages.raw.jsonl')
-        self.file = open(output_path, 'a', encoding='utf-8')
+        # Binary mode: each line is encoded once and written in one call
+        self.file = open(output_path, 'ab', buffering=self.WRITE_BUFFER_BYTES)
+        self.queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self.writer = threading.Thread(target=self._write_loop, name='jsonl-writer', daemon=True)
+        self.writer.start()
         
         logger.info(f"Opened output file: {output_path}")
     
     def close_spider(self, spider):
         """Close the output file when the spider finishes."""
         if self.file:
+            try:
+                self._put(None)
+                self.writer.join()
+            except OSError as e:
+                logger.error(f"Output file is incomplete: {e}")
             self.file.close()
             logger.info(f"Closed output file. Total items written: {self.items_count}")
     
+    def _write_loop(self):
+        """Write queued lines until the None sentinel, coalescing waiting lines."""
+        while True:
+            lines = [self.queue.get()]
+            while len(lines) < self.FLUSH_EVERY_ITEMS:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = lines[-1] is None
+            if stop:
+                lines.pop()
+            
+            try:
+                self.file.write(b''.join(lines))
+                self.items_since_flush += len(lines)
+                if stop or self.items_since_flush >= self.FLUSH_EVERY_ITEMS:
+                    self.file.flush()
+                    self.items_since_flush = 0
+            except Exception as e:
+                # Stop here; process_item fails later items instead of
+                # blocking on a queue that nothing drains
+                self.write_error = e
+                logger.error(f"Error writing output file, {len(lines)} items lost: {e}")
+                return
+            
+            if stop:
+                return
+    
+    def _put(self, line):
+        """Hand a line to the writer thread, raising OSError if it has stopped."""
+        while True:
+            if self.write_error is not None or not self.writer.is_alive():
+                raise OSError(f"Output writer stopped: {self.write_error}")
+            try:
+                self.queue.put(line, timeout=self.PUT_TIMEOUT_SECONDS)
+                return
+            except queue.Full:
+                pass
+    
+    def _fetched_at(self) -> str:
+        """Return the current UTC time in ISO format, cached per window."""
+        now = time.time()
+        if now - self._ts_cache[0] > self.TIMESTAMP_WINDOW_SECONDS:
+            self._ts_cache = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+        return self._ts_cache[1]
+    
     def process_item(self, item, spider):
         """Write item to the JSONL file."""
+        # A plain dict encoded in one dumps call is the fastest form measured:
+        # a pre-built bytes template filled with per-field dumps, or a slotted
+        # dataclass, both encode slower with orjson.
+        g = item.get
         record = {
-            'job_id': getattr(spider, 'job_id', 'unknown'),
-            'url': item.get('url', ''),
-            'canonical_url': item.get('canonical_url', ''),
-            'fetched_at': datetime.now(timezone.utc).isoformat(),
-            'status_code': item.get('status_code', 0),
-            'content_type': item.get('content_type', ''),
-            'title': item.get('title', ''),
-            'text': item.get('text', ''),
-            'markdown': item.get('markdown', ''),
-            'text_hash': item.get('text_hash', ''),
-            'extraction_mode': item.get('extraction_mode', ''),
-            'depth': item.get('depth', 0),
-            'outlinks_count': item.get('outlinks_count', 0),
-            'sections': item.get('sections', []),
-            'breadcrumbs': item.get('breadcrumbs', []),
-            'last_modified': item.get('last_modified'),
-            'quality_score': item.get('quality_score'),
-            'quality_passed': item.get('quality_passed'),
-            'quality_reasons': item.get('quality_reasons', []),
-            'document_id': item.get('document_id'),
-            'is_duplicate': item.get('is_duplicate', False),
-            'counts_toward_budget': item.get('counts_toward_budget', True),
-            'error': item.get('error'),
+            'job_id': self.job_id,
+            'url': g('url', ''),
+            'canonical_url': g('canonical_url', ''),
+            'fetched_at': self._fetched_at(),
+            'status_code': g('status_code', 0),
+            'content_type': g('content_type', ''),
+            'title': g('title', ''),
+            'text': g('text', ''),
+            'markdown': g('markdown', ''),
+            'text_hash': g('text_hash', ''),
+            'extraction_mode': g('extraction_mode', ''),
+            'depth': g('depth', 0),
+            'outlinks_count': g('outlinks_count', 0),
+            'sections': g('sections', []),
+            'breadcrumbs': g('breadcrumbs', []),
+            'last_modified': g('last_modified'),
+            'quality_score': g('quality_score'),
+            'quality_passed': g('quality_passed'),
+            'quality_reasons': g('quality_reasons', []),
+            'document_id': g('document_id'),
+            'is_duplicate': g('is_duplicate', False),
+            'counts_toward_budget': g('counts_toward_budget', True),
+            'error': g('error'),
         }
         
-        # Remove HTML from memory
-        if 'html' in item:
-            del item['html']
-        
-        line = json.dumps(record, ensure_ascii=False)
-        self.file.write(line + '\n')
-        self.file.flush()
-        
+        if HAS_ORJSON:
+            line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        else:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        self._put(line)
         self.items_count += 1
         
         return item
@@ -1,28 +1,165 @@
 """Playwright-based crawler for JavaScript-rendered pages."""
 from __future__ import annotations
 
-import hashlib
+import asyncio
+import functools
 import json
 import logging
+import multiprocessing
 import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Set, List, Dict, Any
+from typing import Set, List, Dict, Any, Tuple
 from urllib.parse import urljoin, urlparse
 
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.async_api import async_playwright, Page, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from config import settings
-from crawler.url_utils import canonicalize_url, is_url_in_scope, extract_hostname, get_path
+from config.constants import ExtractionMode
+from crawler.url_utils import canonicalize_url, compile_ignore_prefixes, is_url_in_scope, extract_hostname, get_path
 from crawler.extractors import trafilatura_ext, readability_ext, plaintext_ext, markdown_ext
+from crawler.extractors._cache import content_digest, extraction_digest
+from crawler.extractors._parse import try_parse_html
+from crawler.text_hash import text_hash
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 
 logger = logging.getLogger(__name__)
 
+# Rendered pages are ready once one of these content roots holds text. SPA
+# shells ship the root empty, so its mere presence says nothing.
+_CONTENT_ROOT_SELECTOR = 'main, article, [role="main"]'
+_CONTENT_ROOT_HAS_TEXT_JS = """(selector) => Array.from(
+    document.querySelectorAll(selector),
+    (root) => root.innerText.trim(),
+).some(Boolean)"""
+_RENDER_WAIT_MS = 2000
+# Extra time after the first text appears, for the rest of the content
+_RENDER_SETTLE_MS = 500
+# Requests that never carry page text; aborting them saves bandwidth and render time
+_BLOCKED_RESOURCE_TYPES = frozenset(['image', 'media', 'font', 'stylesheet'])
+
+# Collects distinct http(s) hrefs on the given host in the browser, so only
+# same-site links cross the CDP connection. Passing no host keeps every host.
+_SAME_SITE_HREFS_JS = """(elements, host) => {
+    const seen = new Set();
+    const out = [];
+    for (const e of elements) {
+        const href = e.href;
+        if (!href || seen.has(href)) continue;
+        seen.add(href);
+        let url;
+        try { url = new URL(href); } catch (err) { continue; }
+        if (url.protocol !== 'http:' && url.protocol !== 'https:') continue;
+        if (host && url.hostname !== host) continue;
+        out.push(href);
+    }
+    return out;
+}"""
+
+# Markup that changes between renders of the same content: scripts, styles
+# and tag attributes (nonces, generated ids, tracking parameters)
+_VOLATILE_MARKUP_RE = re.compile(
+    r'<(script|style)\b[^>]*>.*?</\1\s*>|(<[a-zA-Z][\w:-]*)\s[^>]*?(/?>)',
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+async def _block_assets(route):
+    """Abort asset requests and let documents, scripts and XHR through."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _close_page(page: Page):
+    """Close a page, ignoring errors from a page or browser already gone."""
+    try:
+        await page.close()
+    except Exception as e:
+        logger.debug(f"Error closing page: {e}")
+
+
+def _markup_fingerprint(html: str) -> bytes:
+    """Digest of the HTML with volatile markup removed."""
+    return content_digest(_VOLATILE_MARKUP_RE.sub(lambda m: m.group(2) + m.group(3) if m.group(2) else '', html))
+
+
+def _extract_page(url: str, html: str) -> Dict[str, Any]:
+    """
+    Run the extraction cascade on rendered HTML.
+    
+    Module-level and free of crawler state so it can run in an extractor
+    process.
+    """
+    # Text extraction cascade; readability and plaintext share one parse,
+    # and every extractor shares one cache digest of the HTML
+    tree = try_parse_html(html)
+    digest = extraction_digest(html)
+    text = trafilatura_ext.extract(html, digest=digest)
+    extraction_mode = 'trafilatura'
+    
+    if not text or len(text.strip()) < settings.MIN_TEXT_LENGTH_SUCCESS:
+        text = readability_ext.extract(html, tree, digest=digest)
+        extraction_mode = 'readability'
+    
+    if not text or len(text.strip()) < settings.MIN_TEXT_LENGTH_SUCCESS:
+        text = plaintext_ext.extract(html, tree, digest=digest) or ''
+        extraction_mode = 'fallback'
+    
+    # Get title
+    title = (
+        readability_ext.get_title(html, tree, digest=digest)
+        or plaintext_ext.get_title(html, tree, digest=digest)
+        or ''
+    )
+    
+    # Same dedup hash as the Scrapy pipeline
+    content_hash = text_hash(text)
+    
+    # Extract markdown and metadata; the metadata reads the shared lxml tree
+    try:
+        if tree is not None:
+            breadcrumbs = markdown_ext.extract_breadcrumbs(tree, url)
+            last_modified = markdown_ext.extract_last_modified(tree)
+        else:
+            breadcrumbs = []
+            last_modified = None
+        markdown, sections = markdown_ext.extract_markdown(html, url)
+    except Exception as e:
+        logger.debug(f"Markdown extraction error: {e}")
+        markdown = text
+        sections = []
+        breadcrumbs = []
+        last_modified = None
+    
+    return {
+        'title': title,
+        'text': text,
+        'markdown': markdown,
+        'text_hash': content_hash,
+        'extraction_mode': extraction_mode,
+        'sections': sections,
+        'breadcrumbs': breadcrumbs,
+        'last_modified': last_modified,
+    }
+
 
 class PlaywrightCrawler:
     """Crawler using Playwright for JavaScript-rendered pages."""
     
+    WRITE_BUFFER_BYTES = 1 << 18
+    FLUSH_EVERY_RECORDS = 50
+    
     def __init__(
         self,
         job_id: str,
@@ -36,8 +173,16 @@ class PlaywrightCrawler:
         self.job_id = job_id
         self.start_url = start_url
         self.allowed_host = allowed_host.lower()
+        # The browser reports hostnames in ASCII (punycode) form and brackets
+        # IPv6 literals; hosts it would spell differently are not filtered there
+        try:
+            self.browser_host = self.allowed_host.encode('idna').decode('ascii')
+        except UnicodeError:
+            self.browser_host = None
+        if self.browser_host and ':' in self.browser_host:
+            self.browser_host = None
         self.max_pages = max_pages
-        self.ignore_prefixes = ignore_prefixes or []
+        self.ignore_prefixes = compile_ignore_prefixes(ignore_prefixes)
         self.timeout_seconds = timeout_seconds
         self.output_dir = output_dir or os.path.join(settings.JOBS_OUTPUT_DIR, job_id)
         
@@ -53,7 +198,20 @@ class PlaywrightCrawler:
         else:
             self.allowed_path_prefix = None
         
-        self.seen_urls: Set[str] = set()
+        # Scope check with this crawl's arguments bound once, memoized per URL
+        self._in_scope = functools.lru_cache(maxsize=settings.URL_CACHE_SIZE)(functools.partial(
+            is_url_in_scope,
+            allowed_host=self.allowed_host,
+            ignore_prefixes=self.ignore_prefixes,
+            excluded_extensions=settings.EXCLUDED_EXTENSIONS,
+            allowed_path_prefix=self.allowed_path_prefix,
+        ))
+        
+        # hash() of each canonical URL rather than the URL itself: a 64-bit
+        # key is far smaller, and a false match across a crawl is negligible
+        self.seen_urls: Set[int] = set()
+        # Markup fingerprint -> first page rendered with that content
+        self.content_fingerprints: Dict[bytes, Dict[str, str]] = {}
         self.pages_fetched = 0
         self.start_time = None
         
@@ -63,6 +221,10 @@ class PlaywrightCrawler:
         
         # Output file
         self.output_file = None
+        self.records_since_flush = 0
+        
+        # Extraction processes; None extracts on a thread instead
+        self.extractor_pool = None
     
     def crawl(self) -> Dict[str, Any]:
         """
@@ -75,31 +237,25 @@ class PlaywrightCrawler:
         os.makedirs(self.output_dir, exist_ok=True)
         
         output_path = os.path.join(self.output_dir, 'pages.raw.jsonl')
-        self.output_file = open(output_path, 'a', encoding='utf-8')
+        # Binary and buffered; flushed every FLUSH_EVERY_RECORDS records and on close
+        self.output_file = open(output_path, 'ab', buffering=self.WRITE_BUFFER_BYTES)
         
         logger.info(f"Starting Playwright crawl: job_id={self.job_id}, "
                    f"start_url={self.start_url}, allowed_path_prefix={self.allowed_path_prefix}, "
                    f"max_pages={self.max_pages}")
         
+        # Extraction is CPU-bound and holds the GIL, so it gets its own
+        # processes; more than one per concurrent page would sit idle
+        processes = min(settings.PLAYWRIGHT_EXTRACTION_PROCESSES, settings.PLAYWRIGHT_CRAWL_CONCURRENCY)
+        if processes > 1:
+            # spawn: forking a process that already runs threads is unsafe
+            self.extractor_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage']
-                )
-                
-                context = browser.new_context(
-                    user_agent=settings.CRAWLER_USER_AGENT + ' (JS-enabled)',
-                    viewport={'width': 1280, 'height': 720},
-                    java_script_enabled=True
-                )
-                
-                # Start crawling
-                self._crawl_page(context, self.start_url, depth=0)
-                
-                context.close()
-                browser.close()
-                
+            asyncio.run(self._crawl_async())
         except Exception as e:
             logger.error(f"Playwright crawl error: {e}")
             self.errors.append({
@@ -107,6 +263,9 @@ class PlaywrightCrawler:
                 'error': str(e)
             })
         finally:
+            if self.extractor_pool is not None:
+                self.extractor_pool.shutdown(cancel_futures=True)
+                self.extractor_pool = None
             if self.output_file:
                 self.output_file.close()
         
@@ -124,34 +283,118 @@ class PlaywrightCrawler:
         
         return stats
     
-    def _crawl_page(self, context: BrowserContext, url: str, depth: int):
-        """Crawl a single page and follow links."""
+    async def _crawl_async(self):
+        """Crawl breadth-first with several workers sharing one browser context."""
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-dev-shm-usage']
+            )
+            
+            # One context for every worker: Chromium keeps one connection pool
+            # per context, so pages on the same origin reuse warm connections
+            # (multiplexed over HTTP/2 where the server offers it). A
+            # Connection: keep-alive header would add nothing, and HTTP/2
+            # forbids it.
+            context = await browser.new_context(
+                user_agent=settings.CRAWLER_USER_AGENT + ' (JS-enabled)',
+                viewport={'width': 1280, 'height': 720},
+                java_script_enabled=True
+            )
+            await context.route('**/*', _block_assets)
+            
+            try:
+                await self._drain_frontier(context)
+            finally:
+                await context.close()
+                await browser.close()
+    
+    async def _drain_frontier(self, context: BrowserContext):
+        """Run the workers until the frontier is empty or a worker fails."""
+        frontier: asyncio.Queue = asyncio.Queue()
+        self._enqueue(frontier, self.start_url, 0)
+        workers = [
+            asyncio.create_task(self._worker(context, frontier))
+            for _ in range(max(1, settings.PLAYWRIGHT_CRAWL_CONCURRENCY))
+        ]
+        drained = asyncio.create_task(frontier.join())
+        
+        try:
+            # Workers only return by raising; waiting on the frontier alone
+            # would hang once none were left to drain it
+            done, _ = await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not drained:
+                    task.result()
+        finally:
+            drained.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(drained, *workers, return_exceptions=True)
+    
+    async def _worker(self, context: BrowserContext, frontier: asyncio.Queue):
+        """Crawl queued URLs, reusing one page until a navigation fails."""
+        page = None
+        try:
+            while True:
+                url, canonical, depth = await frontier.get()
+                try:
+                    if page is None:
+                        page = await context.new_page()
+                    if not await self._crawl_page(page, frontier, url, canonical, depth):
+                        # A crashed renderer leaves the tab open (is_closed()
+                        # stays False), so the next URL gets a fresh page
+                        await _close_page(page)
+                        page = None
+                except Exception as e:
+                    logger.warning(f"Error opening page for {url}: {e}")
+                    self.errors.append({
+                        'url': url,
+                        'error': str(e)
+                    })
+                finally:
+                    frontier.task_done()
+        finally:
+            if page:
+                await _close_page(page)
+    
+    def _enqueue(self, frontier: asyncio.Queue, url: str, depth: int):
+        """Queue a URL if it is in scope and has not been seen yet."""
+        if self._in_scope(url):
+            self._enqueue_in_scope(frontier, url, canonicalize_url(url), depth)
+    
+    def _enqueue_in_scope(self, frontier: asyncio.Queue, url: str, canonical: str, depth: int):
+        """
+        Queue an already scope-checked URL that has not been seen yet.
+        
+        URLs are marked seen when queued, so the frontier holds each URL at
+        most once however many pages link to it.
+        """
+        key = hash(canonical)
+        if key in self.seen_urls:
+            return
+        self.seen_urls.add(key)
+        frontier.put_nowait((url, canonical, depth))
+    
+    async def _crawl_page(self, page: Page, frontier: asyncio.Queue, url: str, canonical: str, depth: int) -> bool:
+        """
+        Crawl a single queued page and queue its links.
+        
+        Returns:
+            False if crawling raised, leaving the page unfit for reuse
+        """
         # Check limits
         if self.pages_fetched >= self.max_pages:
-            return
+            return True
         
         elapsed = time.time() - self.start_time
         if elapsed >= self.timeout_seconds:
             logger.info("Timeout reached, stopping crawl")
-            return
+            return True
         
-        # Check if already seen
-        canonical = canonicalize_url(url)
-        if canonical in self.seen_urls:
-            return
-        
-        # Check scope
-        if not is_url_in_scope(url, self.allowed_host, self.ignore_prefixes, settings.EXCLUDED_EXTENSIONS, self.allowed_path_prefix):
-            return
-        
-        self.seen_urls.add(canonical)
-        
-        page = None
         try:
-            page = context.new_page()
-            
             # Navigate with wait for DOM content loaded (faster than networkidle)
-            response = page.goto(
+            response = await page.goto(
                 url,
                 wait_until='domcontentloaded',
                 timeout=45000
@@ -159,26 +402,28 @@ class PlaywrightCrawler:
             
             if response is None:
                 logger.warning(f"No response for {url}")
-                return
+                return True
             
             status_code = response.status
             self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
             
             # Wait for dynamic content to render
-            page.wait_for_timeout(2000)
+            await self._wait_for_content(page)
             
             # Get rendered HTML
-            html = page.content()
+            html = await page.content()
             content_type = response.headers.get('content-type', 'text/html')
             
             # Extract outlinks before processing
-            outlinks = self._extract_links(page, url)
+            outlinks = await self._extract_links(page, url)
             
-            # Process the page
-            record = self._process_page(url, canonical, html, status_code, content_type, depth, len(outlinks))
+            # Extraction runs off the event loop so other pages keep loading
+            record = await self._process_page(
+                url, canonical, html, status_code, content_type, depth, len(outlinks)
+            )
             
-            # Write to output
-            if record:
+            # Write to output; workers already in flight may finish past the limit
+            if record and self.pages_fetched < self.max_pages:
                 self._write_record(record)
                 self.pages_fetched += 1
                 
@@ -187,10 +432,9 @@ class PlaywrightCrawler:
             
             # Follow links (BFS within depth)
             if depth < settings.CRAWLER_DEPTH_LIMIT:
-                for link_url in outlinks:
-                    if self.pages_fetched >= self.max_pages:
-                        break
-                    self._crawl_page(context, link_url, depth + 1)
+                # _extract_links only returns in-scope links
+                for link_url, link_canonical in outlinks:
+                    self._enqueue_in_scope(frontier, link_url, link_canonical, depth + 1)
                     
         except Exception as e:
             logger.warning(f"Error crawling {url}: {e}")
@@ -198,19 +442,27 @@ class PlaywrightCrawler:
                 'url': url,
                 'error': str(e)
             })
-        finally:
-            if page:
-                try:
-                    page.close()
-                except Exception as e:
-                    # Page already closed or browser crashed, safe to ignore
-                    logger.debug(f"Error closing page: {e}")
+            return False
+        return True
     
-    def _extract_links(self, page: Page, base_url: str) -> List[str]:
-        """Extract all links from the page."""
+    async def _wait_for_content(self, page: Page):
+        """Wait until a content root holds text and has settled, for at most _RENDER_WAIT_MS."""
+        started = time.monotonic()
+        try:
+            await page.wait_for_function(
+                _CONTENT_ROOT_HAS_TEXT_JS, arg=_CONTENT_ROOT_SELECTOR, timeout=_RENDER_WAIT_MS
+            )
+        except PlaywrightTimeoutError:
+            # No content root filled in; the full wait has already elapsed
+            return
+        remaining_ms = _RENDER_WAIT_MS - (time.monotonic() - started) * 1000
+        await page.wait_for_timeout(min(_RENDER_SETTLE_MS, max(0, remaining_ms)))
+    
+    async def _extract_links(self, page: Page, base_url: str) -> List[Tuple[str, str]]:
+        """Extract in-scope, unseen links from the page as (url, canonical) pairs."""
         links = []
         try:
-            hrefs = page.eval_on_selector_all('a[href]', 'elements => elements.map(e => e.href)')
+            hrefs = await page.eval_on_selector_all('a[href]', _SAME_SITE_HREFS_JS, self.browser_host)
             
             for href in hrefs:
                 if not href:
@@ -221,17 +473,17 @@ class PlaywrightCrawler:
                     href = urljoin(base_url, href)
                 
                 # Check scope
-                if is_url_in_scope(href, self.allowed_host, self.ignore_prefixes, settings.EXCLUDED_EXTENSIONS, self.allowed_path_prefix):
+                if self._in_scope(href):
                     canonical = canonicalize_url(href)
-                    if canonical not in self.seen_urls:
-                        links.append(href)
+                    if hash(canonical) not in self.seen_urls:
+                        links.append((href, canonical))
                         
         except Exception as e:
             logger.debug(f"Error extracting links: {e}")
         
         return links[:50]  # Limit links per page
     
-    def _process_page(
+    async def _process_page(
         self,
         url: str,
         canonical_url: str,
@@ -245,38 +497,43 @@ class PlaywrightCrawler:
         if not html:
             return None
         
-        # Text extraction cascade
-        text = trafilatura_ext.extract(html)
-        extraction_mode = 'trafilatura'
-        
-        if not text or len(text.strip()) < settings.MIN_TEXT_LENGTH_SUCCESS:
-            text = readability_ext.extract(html)
-            extraction_mode = 'readability'
-        
-        if not text or len(text.strip()) < settings.MIN_TEXT_LENGTH_SUCCESS:
-            text = plaintext_ext.extract(html) or ''
-            extraction_mode = 'fallback'
-        
-        # Get title
-        title = readability_ext.get_title(html) or plaintext_ext.get_title(html) or ''
+        # Rendered duplicates of an earlier page skip the extraction cascade
+        fingerprint = await asyncio.to_thread(_markup_fingerprint, html)
+        original = self.content_fingerprints.get(fingerprint)
+        if original is not None:
+            return {
+                'job_id': self.job_id,
+                'url': url,
+                'canonical_url': canonical_url,
+                'fetched_at': datetime.now(timezone.utc).isoformat(),
+                'status_code': status_code,
+                'content_type': content_type,
+                'title': original['title'],
+                'text': '',
+                'markdown': '',
+                'text_hash': original['text_hash'],
+                'extraction_mode': ExtractionMode.DUPLICATE_SKIPPED,
+                'depth': depth,
+                'outlinks_count': outlinks_count,
+                'sections': [],
+                'breadcrumbs': [],
+                'last_modified': None,
+                'error': None,
+                'js_rendered': True,
+                'duplicate_of': original['canonical_url'],
+            }
         
-        # Compute text hash
-        normalized = ' '.join(text.lower().split())
-        text_hash = f"sha256:{hashlib.sha256(normalized.encode()).hexdigest()}"
+        if self.extractor_pool is not None:
+            loop = asyncio.get_running_loop()
+            extracted = await loop.run_in_executor(self.extractor_pool, _extract_page, url, html)
+        else:
+            extracted = await asyncio.to_thread(_extract_page, url, html)
         
-        # Extract markdown and metadata
-        try:
-            from bs4 import BeautifulSoup
-            markdown, sections = markdown_ext.extract_markdown(html, url)
-            soup = BeautifulSoup(html, 'lxml')
-            breadcrumbs = markdown_ext.extract_breadcrumbs(soup, url)
-            last_modified = markdown_ext.extract_last_modified(soup)
-        except Exception as e:
-            logger.debug(f"Markdown extraction error: {e}")
-            markdown = text
-            sections = []
-            breadcrumbs = []
-            last_modified = None
+        self.content_fingerprints[fingerprint] = {
+            'canonical_url': canonical_url,
+            'title': extracted['title'],
+            'text_hash': extracted['text_hash'],
+        }
         
         return {
             'job_id': self.job_id,
@@ -285,25 +542,31 @@ class PlaywrightCrawler:
             'fetched_at': datetime.now(timezone.utc).isoformat(),
             'status_code': status_code,
             'content_type': content_type,
-            'title': title,
-            'text': text,
-            'markdown': markdown,
-            'text_hash': text_hash,
-            'extraction_mode': extraction_mode,
+            'title': extracted['title'],
+            'text': extracted['text'],
+            'markdown': extracted['markdown'],
+            'text_hash': extracted['text_hash'],
+            'extraction_mode': extracted['extraction_mode'],
             'depth': depth,
             'outlinks_count': outlinks_count,
-            'sections': sections,
-            'breadcrumbs': breadcrumbs,
-            'last_modified': last_modified,
+            'sections': extracted['sections'],
+            'breadcrumbs': extracted['breadcrumbs'],
+            'last_modified': extracted['last_modified'],
             'error': None,
             'js_rendered': True
         }
     
     def _write_record(self, record: Dict[str, Any]):
         """Write a record to the output file."""
-        line = json.dumps(record, ensure_ascii=False)
-        self.output_file.write(line + '\n')
-        self.output_file.flush()
+        if HAS_ORJSON:
+            line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        else:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        self.output_file.write(line)
+        self.records_since_flush += 1
+        if self.records_since_flush >= self.FLUSH_EVERY_RECORDS:
+            self.output_file.flush()
+            self.records_since_flush = 0
 
 
 def run_playwright_crawl(
@@ -8,7 +8,7 @@ from typing import List
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
 
 from config import settings
-from crawler.url_utils import canonicalize_url, is_url_in_scope
+from crawler.url_utils import canonicalize_url, compile_ignore_prefixes, is_url_in_scope
 
 
 logger = logging.getLogger(__name__)
@@ -38,7 +38,7 @@ class PlaywrightDiscoverySession:
     ):
         self.allowed_host = allowed_host.lower()
         self.allowed_path_prefix = allowed_path_prefix
-        self.ignore_prefixes = ignore_prefixes or []
+        self.ignore_prefixes = compile_ignore_prefixes(ignore_prefixes)
         self._playwright = None
         self._browser: Browser | None = None
         self._context: BrowserContext | None = None
@@ -1,9 +1,21 @@
 """Content quality scoring and gating."""
 from __future__ import annotations
 
+import logging
 import re
+import threading
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List
+
+from crawler._cleanup import detect_duplicate_lines
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -55,16 +67,61 @@ BOILERPLATE_PHRASES = [
 
 # Compiled patterns for efficiency
 _BOILERPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in BOILERPLATE_PHRASES]
+# The phrases are lowercase, so lowercased text can be searched without
+# IGNORECASE, which makes every search several times slower
+_LOWER_BOILERPLATE_PATTERNS = [re.compile(p) for p in BOILERPLATE_PHRASES]
+# Characters lower() leaves alone that IGNORECASE still equates with ASCII
+# letters; text containing them needs the IGNORECASE patterns
+_IGNORECASE_EXTRAS = ('\u0131', '\u017f')
+
+
+def _compile_boilerplate_database():
+    """Compile the phrases into one Hyperscan database reporting each phrase once."""
+    if not HAS_HYPERSCAN:
+        return None
+    expressions = [p.encode('ascii') for p in BOILERPLATE_PHRASES]
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=hyperscan.HS_FLAG_SINGLEMATCH,
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan unavailable for boilerplate scoring, using fallback: {e}")
+        return None
+    return database
+
+
+_BOILERPLATE_DATABASE = _compile_boilerplate_database()
+
+# Hyperscan scratch space cannot be shared between concurrent scans
+_scan_state = threading.local()
+
+
+def _on_phrase_match(phrase_id, start, end, flags, hits):
+    hits.add(phrase_id)
 
 
 def count_boilerplate_matches(text: str) -> int:
     """Count how many boilerplate phrases appear in text."""
-    count = 0
     text_lower = text.lower()
-    for pattern in _BOILERPLATE_PATTERNS:
-        if pattern.search(text_lower):
-            count += 1
-    return count
+    if not text_lower.isascii() and any(c in text_lower for c in _IGNORECASE_EXTRAS):
+        return sum(1 for pattern in _BOILERPLATE_PATTERNS if pattern.search(text_lower))
+    
+    if _BOILERPLATE_DATABASE is not None:
+        scratch = getattr(_scan_state, 'scratch', None)
+        if scratch is None:
+            scratch = _scan_state.scratch = hyperscan.Scratch(_BOILERPLATE_DATABASE)
+        hits = set()
+        _BOILERPLATE_DATABASE.scan(
+            text_lower.encode('utf-8', 'surrogatepass'),
+            match_event_handler=_on_phrase_match, context=hits, scratch=scratch,
+        )
+        return len(hits)
+    
+    return sum(1 for pattern in _LOWER_BOILERPLATE_PATTERNS if pattern.search(text_lower))
 
 
 def calculate_link_density(text: str, html: str) -> float:
@@ -99,25 +156,6 @@ def calculate_text_density(text: str, html: str) -> float:
     return min(1.0, text_len / html_len)
 
 
-def detect_duplicate_lines(text: str) -> Tuple[int, int]:
-    """
-    Detect duplicate consecutive lines (common in bad extractions).
-    Returns (duplicate_count, total_lines).
-    """
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    if len(lines) < 2:
-        return 0, len(lines)
-    
-    duplicates = 0
-    prev_line = None
-    for line in lines:
-        if line == prev_line and len(line) > 10:
-            duplicates += 1
-        prev_line = line
-    
-    return duplicates, len(lines)
-
-
 def score_content(
     text: str,
     html: str = '',
@@ -138,6 +176,9 @@ def score_content(
     
     Returns QualityScore with pass/fail and detailed metrics.
     """
+    # Scored one page at a time: pipelines see single items, and the score
+    # arithmetic is under a tenth of the cost next to the text scans below,
+    # so batching it into arrays would not pay for itself.
     reasons = []
     metrics = {}
     
@@ -38,6 +38,8 @@ HTTPERROR_ALLOWED_CODES = [403, 404, 429, 500, 502, 503, 504]
 
 ITEM_PIPELINES = {
     'crawler.pipelines.TextExtractionPipeline': 100,
+    # Must run after every pipeline that reads item['html']
+    'crawler.pipelines.HtmlDropPipeline': 150,
     'crawler.pipelines.BlockingDetectionPipeline': 200,
     'crawler.pipelines.JSONLWriterPipeline': 300,
 }
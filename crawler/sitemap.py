@@ -7,7 +7,7 @@ from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 import xml.etree.ElementTree as ET
 
-from crawler.url_utils import canonicalize_url, is_url_in_scope
+from crawler.url_utils import canonicalize_url, compile_ignore_prefixes, is_url_in_scope
 from config import settings
 
 
@@ -21,7 +21,7 @@ def discover_sitemap_urls(
     ignore_prefixes: list[str] | None = None,
 ) -> list[str]:
     """Return in-scope URLs discovered from the site's sitemap, if available."""
-    ignore_prefixes = ignore_prefixes or []
+    ignore_prefixes = compile_ignore_prefixes(ignore_prefixes)
     sitemap_queue = deque(_candidate_sitemaps(start_url))
     visited_sitemaps: set[str] = set()
     seen_urls: set[str] = set()
@@ -1,18 +1,27 @@
 """Docs crawler spider."""
+import functools
 import json
 import logging
 import os
 
+from urllib.parse import urljoin
+
 import scrapy
+from lxml import etree
 from scrapy.linkextractors import LinkExtractor
 from scrapy.spiders import CrawlSpider, Rule
+from scrapy.utils.response import get_base_url
 
 from config import settings
-from crawler.url_utils import canonicalize_url, is_url_in_scope
+from crawler.url_utils import canonicalize_url, compile_ignore_prefixes, is_url_in_scope
 
 
 logger = logging.getLogger(__name__)
 
+# Plain str results: smart strings would keep each page's tree alive
+# through the requests built from its links
+_HREF_XPATH = etree.XPath('//a/@href', smart_strings=False)
+
 
 class DocsSpider(CrawlSpider):
     """Spider for crawling documentation sites."""
@@ -66,16 +75,27 @@ class DocsSpider(CrawlSpider):
         
         self.max_pages = int(max_pages) if max_pages else settings.DEFAULT_MAX_PAGES
         
+        prefixes = []
         if ignore_prefixes:
             try:
-                self.ignore_prefixes = json.loads(ignore_prefixes)
+                prefixes = json.loads(ignore_prefixes)
             except json.JSONDecodeError:
-                self.ignore_prefixes = []
-        else:
-            self.ignore_prefixes = []
+                pass
+        self.ignore_prefixes = compile_ignore_prefixes(prefixes)
+        
+        # Scope check with this crawl's arguments bound once, memoized per URL
+        self._in_scope = functools.lru_cache(maxsize=settings.URL_CACHE_SIZE)(functools.partial(
+            is_url_in_scope,
+            allowed_host=self.allowed_host,
+            ignore_prefixes=self.ignore_prefixes,
+            excluded_extensions=settings.EXCLUDED_EXTENSIONS,
+            allowed_path_prefix=self.allowed_path_prefix,
+        ))
         
         self.pages_fetched = 0
-        self.seen_urls = set()
+        # hash() of each canonical URL rather than the URL itself: a 64-bit
+        # key is far smaller, and a false match across a crawl is negligible
+        self.seen_urls: set[int] = set()
         
         self.rules = (
             Rule(
@@ -114,15 +134,15 @@ class DocsSpider(CrawlSpider):
         url = response.url
         canonical = canonicalize_url(url)
         
-        if canonical in self.seen_urls:
+        if hash(canonical) in self.seen_urls:
             logger.debug(f"Skipping duplicate URL: {url}")
             return
         
-        if not is_url_in_scope(url, self.allowed_host, self.ignore_prefixes, settings.EXCLUDED_EXTENSIONS, self.allowed_path_prefix):
+        if not self._in_scope(url):
             logger.debug(f"URL out of scope: {url}")
             return
         
-        self.seen_urls.add(canonical)
+        self.seen_urls.add(hash(canonical))
         self.pages_fetched += 1
         
         content_type = response.headers.get('Content-Type', b'').decode('utf-8', errors='ignore')
@@ -136,11 +156,17 @@ class DocsSpider(CrawlSpider):
                 html = ''
         
         outlinks = []
+        html_tree = None
         if html and hasattr(response, 'xpath'):
-            for link in response.xpath('//a/@href').getall():
+            # The selector parses the page for link extraction; the extraction
+            # pipelines reuse that tree instead of parsing the HTML again.
+            html_tree = response.selector.root
+            # Resolve hrefs straight off the tree against one base URL
+            base_url = get_base_url(response)
+            for link in _HREF_XPATH(html_tree):
                 try:
-                    absolute_url = response.urljoin(link)
-                    if is_url_in_scope(absolute_url, self.allowed_host, self.ignore_prefixes, settings.EXCLUDED_EXTENSIONS, self.allowed_path_prefix):
+                    absolute_url = urljoin(base_url, link)
+                    if self._in_scope(absolute_url):
                         outlinks.append(absolute_url)
                 except (ValueError, TypeError) as e:
                     # Invalid URL format or type issues when joining/parsing URLs
@@ -154,6 +180,7 @@ class DocsSpider(CrawlSpider):
             'status_code': response.status,
             'content_type': content_type,
             'html': html,
+            '_html_tree': html_tree,
             'depth': depth,
             'outlinks_count': len(outlinks),
             'title': None,
@@ -167,7 +194,7 @@ class DocsSpider(CrawlSpider):
         
         for link_url in outlinks:
             link_canonical = canonicalize_url(link_url)
-            if link_canonical not in self.seen_urls:
+            if hash(link_canonical) not in self.seen_urls:
                 yield scrapy.Request(
                     link_url,
                     callback=self.parse_page,
@@ -0,0 +1,31 @@
+"""Dedup hash of extracted text, shared by the Scrapy and Playwright crawlers."""
+from __future__ import annotations
+
+import hashlib
+
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+
+def text_digest(data: bytes) -> str:
+    """Return a prefixed dedup digest: 128-bit BLAKE3 if available, else SHA256."""
+    if HAS_BLAKE3:
+        return f"blake3:{blake3.blake3(data).hexdigest(length=16)}"
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+EMPTY_TEXT_HASH = text_digest(b'')
+
+
+def text_hash(text: str) -> str:
+    """Hash text after lowercasing it and collapsing whitespace."""
+    if not text:
+        return EMPTY_TEXT_HASH
+    # split()/join() is the fastest whitespace collapse available here: a
+    # re.sub pass or a bytes-level rewrite measures slower on long text, and
+    # bytes.lower() would leave non-ASCII letters unfolded.
+    normalized = ' '.join(text.lower().split())
+    return text_digest(normalized.encode())
@@ -2,7 +2,11 @@
 from __future__ import annotations
 
 import re
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from bisect import bisect_right
+from functools import lru_cache
+from urllib.parse import urlparse, urlsplit, urlunsplit, uses_params
+
+from config import settings
 
 
 # Tracking parameters to strip from URLs
@@ -24,6 +28,22 @@ TRACKING_PARAMS = {
     'return_to', 'locale', 'locale_id',
 }
 
+# Tracking parameter names as they can appear in a lowercased query
+_TRACKING_PARAM_RE = re.compile(
+    r'(?:^|&)(?:' + '|'.join(map(re.escape, sorted(TRACKING_PARAMS))) + r')(?:[=&]|\Z)'
+)
+
+# RFC 3986 Appendix B, with the scheme restricted to scheme characters the
+# way urlsplit does; anything after the query is the fragment
+_URI_RE = re.compile(r'(?:([A-Za-z][A-Za-z0-9+.-]*):)?(?://([^/?#]*))?([^?#]*)(?:\?([^#]*))?')
+# What urlsplit strips from the front and removes from anywhere
+_LEADING_CONTROL_OR_SPACE = ''.join(map(chr, range(33)))
+_UNSAFE_URL_CHARS_RE = re.compile(r'[\t\r\n]')
+_MULTI_SLASH_RE = re.compile(r'/+')
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+# Links repeat heavily across the pages of one site (nav, footers, siblings)
+_URL_CACHE_SIZE = settings.URL_CACHE_SIZE
+
 # Global deny list patterns for non-content URLs
 DENY_PATH_PATTERNS = [
     # Language/locale switchers
@@ -75,38 +95,32 @@ DENY_EXTERNAL_PATTERNS = [
 ]
 
 
+def _strip_tracking_query(query: str) -> str:
+    """Drop tracking parameters from a raw query string, keeping the rest as is."""
+    if not _TRACKING_PARAM_RE.search(query.lower()):
+        return query
+    return '&'.join(
+        pair for pair in query.split('&')
+        if pair.partition('=')[0].lower() not in TRACKING_PARAMS
+    )
+
+
 def strip_tracking_params(url: str) -> str:
     """
     Remove tracking parameters from URL query string.
     Preserves meaningful query params like page IDs or article slugs.
     """
-    try:
-        parsed = urlparse(url)
-        if not parsed.query:
-            return url
-        
-        params = parse_qs(parsed.query, keep_blank_values=True)
-        
-        # Filter out tracking params
-        filtered = {
-            k: v for k, v in params.items()
-            if k.lower() not in TRACKING_PARAMS
-        }
-        
-        # Rebuild URL
-        new_query = urlencode(filtered, doseq=True) if filtered else ''
-        return urlunparse((
-            parsed.scheme,
-            parsed.netloc,
-            parsed.path,
-            parsed.params,
-            new_query,
-            ''  # Remove fragment
-        ))
-    except Exception:
+    head, _, _ = url.partition('#')
+    base, _, query = head.partition('?')
+    if not query:
         return url
+    
+    # The other params keep their original encoding and order
+    query = _strip_tracking_query(query)
+    return f"{base}?{query}" if query else base
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def canonicalize_url(url: str) -> str:
     """
     Canonicalize a URL for deduplication.
@@ -116,25 +130,32 @@ def canonicalize_url(url: str) -> str:
     - Strip tracking parameters
     - Normalize path (collapse //, remove trailing slash except root)
     """
-    try:
-        # First strip tracking params
-        url = strip_tracking_params(url)
-        
-        parsed = urlparse(url)
-    except Exception:
-        return url
+    # One regex match splits the URL; urlsplit is only consulted to reject
+    # the hosts it would refuse (bad IPv6 brackets, non-ASCII lookalikes)
+    raw = _UNSAFE_URL_CHARS_RE.sub('', url.lstrip(_LEADING_CONTROL_OR_SPACE))
+    scheme, netloc, path, query = _URI_RE.match(raw).groups('')
+    if netloc and (not netloc.isascii() or '[' in netloc or ']' in netloc):
+        try:
+            urlsplit(raw)
+        except ValueError:
+            return url
     
-    scheme = parsed.scheme.lower()
-    netloc = parsed.netloc.lower()
+    scheme = scheme.lower()
+    netloc = netloc.lower()
     
-    if ':' in netloc:
-        host, port = netloc.rsplit(':', 1)
-        if (scheme == 'http' and port == '80') or (scheme == 'https' and port == '443'):
-            netloc = host
+    host, sep, port = netloc.rpartition(':')
+    if sep and _DEFAULT_PORTS.get(scheme) == port:
+        netloc = host
     
-    path = parsed.path or '/'
+    # Path parameters on the last segment are dropped, as urlparse split them off
+    if ';' in path and scheme in uses_params:
+        semicolon = path.find(';', max(path.rfind('/'), 0))
+        if semicolon >= 0:
+            path = path[:semicolon]
     
-    path = re.sub(r'/+', '/', path)
+    path = path or '/'
+    
+    path = _MULTI_SLASH_RE.sub('/', path)
     
     if path.endswith('/index.html') or path.endswith('/index.htm'):
         path = path.rsplit('/', 1)[0] + '/'
@@ -146,13 +167,15 @@ def canonicalize_url(url: str) -> str:
         path = '/'
     
     # Keep non-tracking query params for canonicalization
-    query = parsed.query if parsed.query else ''
-    
-    canonical = urlunparse((scheme, netloc, path, '', query, ''))
+    query = _strip_tracking_query(query) if query else ''
     
-    return canonical
+    if not netloc:
+        return urlunsplit((scheme, netloc, path, query, ''))
+    canonical = f"{scheme}://{netloc}{path}" if scheme else f"//{netloc}{path}"
+    return f"{canonical}?{query}" if query else canonical
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def extract_hostname(url: str) -> str | None:
     """Extract the hostname from a URL."""
     try:
@@ -170,6 +193,7 @@ def is_same_host(url: str, allowed_host: str) -> bool:
     return hostname == allowed_host.lower()
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def is_valid_scheme(url: str) -> bool:
     """Check if a URL has a valid scheme (http or https)."""
     try:
@@ -179,6 +203,7 @@ def is_valid_scheme(url: str) -> bool:
         return False
 
 
+@lru_cache(maxsize=_URL_CACHE_SIZE)
 def get_path(url: str) -> str:
     """Extract the path from a URL."""
     try:
@@ -188,29 +213,93 @@ def get_path(url: str) -> str:
         return '/'
 
 
+def clear_url_caches() -> None:
+    """Drop memoized URL results, e.g. once a job is finished."""
+    for func in (canonicalize_url, extract_hostname, is_valid_scheme, get_path):
+        func.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def _extension_pattern(extensions: frozenset) -> re.Pattern:
+    """Compile an extension set into one case-insensitive path-suffix regex."""
+    alternatives = sorted((re.escape(ext.lstrip('.')) for ext in extensions), key=len, reverse=True)
+    return re.compile(r'\.(?:' + '|'.join(alternatives) + r')\Z', re.IGNORECASE)
+
+
+def _has_excluded_extension_path(path: str, excluded_extensions: set) -> bool:
+    # One anchored suffix regex per extension set; it measures faster than
+    # path.lower().endswith(tuple) and needs no lowercased copy of the path
+    if excluded_extensions is settings.EXCLUDED_EXTENSIONS:
+        pattern = settings.EXCLUDED_EXTENSIONS_RE
+    elif not excluded_extensions:
+        return False
+    else:
+        pattern = _extension_pattern(frozenset(excluded_extensions))
+    return pattern.search(path) is not None
+
+
 def has_excluded_extension(url: str, excluded_extensions: set) -> bool:
     """Check if a URL has an excluded file extension."""
-    path = get_path(url).lower()
-    
-    for ext in excluded_extensions:
-        if path.endswith(ext):
-            return True
+    return _has_excluded_extension_path(get_path(url), excluded_extensions)
+
+
+class IgnorePrefixes(tuple):
+    """Sorted, prefix-free ignore prefixes built by compile_ignore_prefixes."""
+    __slots__ = ()
+
+
+def compile_ignore_prefixes(prefixes) -> IgnorePrefixes:
+    """
+    Precompute ignore prefixes for matching with one bisect per path.
     
-    return False
+    Prefixes already covered by a shorter one are dropped. In the remaining
+    sorted, prefix-free tuple, only the greatest entry not after a path can
+    be a prefix of it, whatever the number of prefixes.
+    """
+    index = []
+    for prefix in sorted(set(prefixes or ())):
+        if not index or not prefix.startswith(index[-1]):
+            index.append(prefix)
+    return IgnorePrefixes(index)
 
 
-def matches_ignore_prefix(url: str, ignore_prefixes: list[str]) -> bool:
-    """Check if a URL path matches any ignore prefix."""
+def _matches_ignore_prefix_path(path: str, ignore_prefixes) -> bool:
     if not ignore_prefixes:
         return False
+    if not isinstance(ignore_prefixes, IgnorePrefixes):
+        return path.startswith(tuple(ignore_prefixes))
+    i = bisect_right(ignore_prefixes, path)
+    return i > 0 and path.startswith(ignore_prefixes[i - 1])
+
+
+def matches_ignore_prefix(url: str, ignore_prefixes: list[str]) -> bool:
+    """Check if a URL path matches any ignore prefix."""
+    return _matches_ignore_prefix_path(get_path(url), ignore_prefixes)
+
+
+def _union_pattern(patterns: list[str], flags: int = 0) -> re.Pattern:
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+# Each list as one alternation, searched once per URL. The patterns are
+# ASCII and run on lowercased text, so case folding is only needed for the
+# few non-ASCII characters that lower() leaves alone but IGNORECASE still
+# equates with ASCII letters (dotless i, long s).
+_DENY_PATH_RE = _union_pattern(DENY_PATH_PATTERNS)
+_DENY_EXTERNAL_RE = _union_pattern(DENY_EXTERNAL_PATTERNS)
+_DENY_PATH_RE_I = _union_pattern(DENY_PATH_PATTERNS, re.IGNORECASE)
+_DENY_EXTERNAL_RE_I = _union_pattern(DENY_EXTERNAL_PATTERNS, re.IGNORECASE)
+
+
+def _matches_deny_pattern_path(path: str, url: str) -> bool:
+    full_url = url.lower()
+    if full_url.isascii():
+        path_re, external_re = _DENY_PATH_RE, _DENY_EXTERNAL_RE
+    else:
+        path_re, external_re = _DENY_PATH_RE_I, _DENY_EXTERNAL_RE_I
     
-    path = get_path(url)
-    
-    for prefix in ignore_prefixes:
-        if path.startswith(prefix):
-            return True
-    
-    return False
+    # Check path patterns, then external share patterns
+    return bool(path_re.search(path.lower()) or external_re.search(full_url))
 
 
 def matches_deny_pattern(url: str) -> bool:
@@ -218,20 +307,7 @@ def matches_deny_pattern(url: str) -> bool:
     Check if URL matches global deny patterns (non-content pages).
     """
     try:
-        path = get_path(url).lower()
-        full_url = url.lower()
-        
-        # Check path patterns
-        for pattern in DENY_PATH_PATTERNS:
-            if re.search(pattern, path, re.IGNORECASE):
-                return True
-        
-        # Check external share patterns
-        for pattern in DENY_EXTERNAL_PATTERNS:
-            if re.search(pattern, full_url, re.IGNORECASE):
-                return True
-        
-        return False
+        return _matches_deny_pattern_path(get_path(url), url)
     except Exception:
         return False
 
@@ -261,18 +337,24 @@ def is_url_in_scope(
         excluded_extensions: Set of file extensions to exclude
         allowed_path_prefix: If set, only URLs under this path are allowed
     """
-    if not is_valid_scheme(url):
+    # Parse once and run every check against the same components
+    try:
+        parsed = urlparse(url)
+    except Exception:
         return False
     
-    if not is_same_host(url, allowed_host):
+    if parsed.scheme.lower() not in ('http', 'https'):
         return False
     
+    if not parsed.hostname or parsed.hostname != allowed_host.lower():
+        return False
+    
+    url_path = parsed.path or '/'
+    
     # Check if URL is under the allowed path prefix
     if allowed_path_prefix:
-        url_path = get_path(url)
         # Normalize: ensure prefix ends with / if it's a directory
         normalized_prefix = allowed_path_prefix.rstrip('/') + '/'
-        normalized_path = url_path if url_path.endswith('/') else url_path + '/'
         
         # Allow exact match or paths starting with the prefix
         if url_path != allowed_path_prefix and not url_path.startswith(normalized_prefix):
@@ -280,13 +362,13 @@ def is_url_in_scope(
             if not url_path.startswith(allowed_path_prefix.rstrip('/')):
                 return False
     
-    if matches_ignore_prefix(url, ignore_prefixes):
+    if _matches_ignore_prefix_path(url_path, ignore_prefixes):
         return False
     
-    if has_excluded_extension(url, excluded_extensions):
+    if _has_excluded_extension_path(url_path, excluded_extensions):
         return False
     
-    if matches_deny_pattern(url):
+    if _matches_deny_pattern_path(url_path, url):
         return False
     
     return True
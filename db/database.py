@@ -13,6 +13,21 @@ from config import settings
 logger = logging.getLogger(__name__)
 _local = threading.local()
 
+# Applied once when a thread opens its connection; the connection is then
+# reused for every request or job that thread serves. Under WAL,
+# synchronous=NORMAL skips the fsync on each commit: the database stays
+# consistent, and a power loss can only drop the last commits, which a
+# crawl re-fetches. The page cache is per connection, hence kept at 20 MB.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+)
+
 
 def _is_expected_migration_error(error: sqlite3.OperationalError) -> bool:
     """Best-effort filter for idempotent migration errors."""
@@ -36,9 +51,8 @@ def get_connection() -> sqlite3.Connection:
             timeout=30.0
         )
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA busy_timeout=5000")
-        conn.execute("PRAGMA foreign_keys=ON")
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         _local.connection = conn
     return _local.connection
 
@@ -63,6 +77,28 @@ def transaction():
         raise
 
 
+def _dedupe_url_queue(conn: sqlite3.Connection) -> None:
+    """Drop duplicate queue rows once, before migration 011 makes them unique."""
+    schema = {
+        (row[0], row[1])
+        for row in conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE name IN (?, ?)",
+            ("url_queue", "url_queue_job_canonical_uniq_idx"),
+        )
+    }
+    if ("table", "url_queue") not in schema or ("index", "url_queue_job_canonical_uniq_idx") in schema:
+        return
+    conn.execute(
+        """
+        DELETE FROM url_queue
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM url_queue GROUP BY job_id, canonical_url
+        )
+        """
+    )
+    conn.commit()
+
+
 def init_db():
     """Initialize the database with the schema."""
     migrations_dir = os.path.join(
@@ -76,6 +112,7 @@ def init_db():
         if filename.endswith(".sql")
     )
     
+    _dedupe_url_queue(conn)
     for filename in migration_files:
         migration_path = os.path.join(migrations_dir, filename)
         try:
@@ -3,11 +3,14 @@ from __future__ import annotations
 
 import hashlib
 import json
+import math
+import threading
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
-from db import database
+from config import settings
+from db import database, log_writer
 
 
 def _now_iso() -> str:
@@ -26,6 +29,78 @@ def _row_to_dict(row) -> dict | None:
 # URL Queue (Frontier)
 # ============================================================================
 
+class _BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, rare false positives."""
+    __slots__ = ('_bits', '_size', '_hashes')
+    
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self._size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+    
+    def _positions(self, value: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self._size
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % size
+    
+    def add(self, value: str) -> None:
+        bits = self._bits
+        for position in self._positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        # Stops at the first clear bit, so absent values are cheap
+        for position in self._positions(value):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+# Canonical URLs queued per job, so most "not seen yet" answers skip SQLite.
+# Built from url_queue on first use, then fed by this process's inserts; a
+# job's queue is only written by the worker that runs it.
+_seen_filters: dict[str, _BloomFilter] = {}
+_seen_lock = threading.Lock()
+
+
+def _seen_filter(job_id: str) -> _BloomFilter:
+    seen = _seen_filters.get(job_id)
+    if seen is not None:
+        return seen
+    with _seen_lock:
+        seen = _seen_filters.get(job_id)
+        if seen is None:
+            seen = _BloomFilter(settings.FRONTIER_BLOOM_CAPACITY, settings.FRONTIER_BLOOM_ERROR_RATE)
+            cursor = database.execute_query(
+                "SELECT canonical_url FROM url_queue WHERE job_id = ?", (job_id,)
+            )
+            for row in cursor:
+                seen.add(row['canonical_url'])
+            _seen_filters[job_id] = seen
+    return seen
+
+
+def _remember_urls(job_id: str, canonical_urls) -> None:
+    # Under the lock so a filter being built cannot miss a committed insert
+    with _seen_lock:
+        seen = _seen_filters.get(job_id)
+        if seen is not None:
+            for canonical_url in canonical_urls:
+                seen.add(canonical_url)
+
+
+def forget_seen_urls(job_id: str) -> None:
+    """Drop the in-memory seen-URL filter of a finished job."""
+    with _seen_lock:
+        _seen_filters.pop(job_id, None)
+
+
 def enqueue_url(
     job_id: str,
     url: str,
@@ -40,22 +115,21 @@ def enqueue_url(
     now = _now_iso()
     
     # Check if already in queue
-    existing = database.fetchone(
-        "SELECT id FROM url_queue WHERE job_id = ? AND canonical_url = ?",
-        (job_id, canonical_url)
-    )
-    if existing:
+    if is_url_seen(job_id, canonical_url):
         return None
     
-    database.execute_query(
+    cursor = database.execute_query(
         """
-        INSERT INTO url_queue (
+        INSERT OR IGNORE INTO url_queue (
             job_id, url, canonical_url, state, depth, priority, discovered_at
         ) VALUES (?, ?, ?, 'queued', ?, ?, ?)
         """,
         (job_id, url, canonical_url, depth, priority, now)
     )
     database.commit()
+    _remember_urls(job_id, (canonical_url,))
+    if cursor.rowcount == 0:
+        return None
     
     row = database.fetchone(
         "SELECT * FROM url_queue WHERE job_id = ? AND canonical_url = ?",
@@ -70,29 +144,28 @@ def enqueue_urls_batch(
 ) -> int:
     """
     Batch enqueue URLs. Returns count of newly added URLs.
+    
+    Duplicates, already queued or repeated within the batch, are dropped by
+    the unique (job_id, canonical_url) index.
     """
+    if not urls:
+        return 0
     now = _now_iso()
-    added = 0
     
-    for url, canonical_url, depth, priority in urls:
-        # Check if already exists
-        existing = database.fetchone(
-            "SELECT id FROM url_queue WHERE job_id = ? AND canonical_url = ?",
-            (job_id, canonical_url)
-        )
-        if not existing:
-            database.execute_query(
-                """
-                INSERT INTO url_queue (
-                    job_id, url, canonical_url, state, depth, priority, discovered_at
-                ) VALUES (?, ?, ?, 'queued', ?, ?, ?)
-                """,
+    with database.transaction() as conn:
+        cursor = conn.executemany(
+            """
+            INSERT OR IGNORE INTO url_queue (
+                job_id, url, canonical_url, state, depth, priority, discovered_at
+            ) VALUES (?, ?, ?, 'queued', ?, ?, ?)
+            """,
+            [
                 (job_id, url, canonical_url, depth, priority, now)
-            )
-            added += 1
-    
-    database.commit()
-    return added
+                for url, canonical_url, depth, priority in urls
+            ]
+        )
+    _remember_urls(job_id, [canonical_url for _, canonical_url, _, _ in urls])
+    return cursor.rowcount
 
 
 def lease_urls(
@@ -109,40 +182,36 @@ def lease_urls(
     now_iso = now.isoformat()
     expires_at = (now + timedelta(seconds=lease_seconds)).isoformat()
     
-    # First, release expired leases
-    database.execute_query(
-        """
-        UPDATE url_queue 
-        SET state = 'queued', leased_at = NULL, leased_by = NULL, lease_expires_at = NULL
-        WHERE job_id = ? AND state = 'fetching' AND lease_expires_at < ?
-        """,
-        (job_id, now_iso)
-    )
-    
-    # Get URLs to lease (priority order, then discovery order)
-    rows = database.fetchall(
-        """
-        SELECT * FROM url_queue 
-        WHERE job_id = ? AND state = 'queued'
-        ORDER BY priority DESC, depth ASC, discovered_at ASC
-        LIMIT ?
-        """,
-        (job_id, batch_size)
-    )
-    
-    leased = []
-    for row in rows:
-        database.execute_query(
+    with database.transaction() as conn:
+        # First, release expired leases
+        conn.execute(
             """
             UPDATE url_queue 
-            SET state = 'fetching', leased_at = ?, leased_by = ?, lease_expires_at = ?
-            WHERE id = ?
+            SET state = 'queued', leased_at = NULL, leased_by = NULL, lease_expires_at = NULL
+            WHERE job_id = ? AND state = 'fetching' AND lease_expires_at < ?
             """,
-            (now_iso, worker_id, expires_at, row['id'])
+            (job_id, now_iso)
         )
-        leased.append(_row_to_dict(row))
+        
+        # Lease the next URLs (priority order, then discovery order) in one statement
+        rows = conn.execute(
+            """
+            UPDATE url_queue 
+            SET state = 'fetching', leased_at = ?, leased_by = ?, lease_expires_at = ?
+            WHERE id IN (
+                SELECT id FROM url_queue 
+                WHERE job_id = ? AND state = 'queued'
+                ORDER BY priority DESC, depth ASC, discovered_at ASC
+                LIMIT ?
+            )
+            RETURNING *
+            """,
+            (now_iso, worker_id, expires_at, job_id, batch_size)
+        ).fetchall()
     
-    database.commit()
+    # RETURNING yields rows in no particular order
+    leased = [_row_to_dict(row) for row in rows]
+    leased.sort(key=lambda row: (-row['priority'], row['depth'], row['discovered_at'], row['id']))
     return leased
 
 
@@ -220,6 +289,8 @@ def get_queue_stats(job_id: str) -> dict:
 
 def is_url_seen(job_id: str, canonical_url: str) -> bool:
     """Check if a URL has already been queued."""
+    if canonical_url not in _seen_filter(job_id):
+        return False
     row = database.fetchone(
         "SELECT id FROM url_queue WHERE job_id = ? AND canonical_url = ?",
         (job_id, canonical_url)
@@ -379,26 +450,48 @@ def log_crawl_event(
     depth: int = None,
     retry_count: int = None,
 ):
-    """Log a crawl event to the database."""
+    """
+    Log a crawl event to the database.
+    
+    The row is written asynchronously, batched with other events by
+    db.log_writer; readers below flush it first.
+    """
+    log_writer.submit((
+        job_id, url, canonical_url, _now_iso(), latency_ms,
+        status_code, content_type, content_length,
+        stage, extraction_mode, quality_score,
+        error_type, error_message, depth, retry_count
+    ))
+
+
+def log_crawl_events_batch(job_id: str, events: List[dict]) -> int:
+    """
+    Log several crawl events with one statement and one commit.
+    
+    Each event takes the keyword arguments of log_crawl_event, plus an
+    optional 'timestamp' recorded when the event happened.
+    """
+    if not events:
+        return 0
     now = _now_iso()
     
-    database.execute_query(
-        """
-        INSERT INTO crawl_logs (
-            job_id, url, canonical_url, timestamp, latency_ms,
-            status_code, content_type, content_length,
-            stage, extraction_mode, quality_score,
-            error_type, error_message, depth, retry_count
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            job_id, url, canonical_url, now, latency_ms,
-            status_code, content_type, content_length,
-            stage, extraction_mode, quality_score,
-            error_type, error_message, depth, retry_count
-        )
+    database.execute_many(
+        log_writer.CRAWL_LOG_INSERT_SQL,
+        [
+            (
+                job_id, event.get('url'), event.get('canonical_url'),
+                event.get('timestamp') or now, event.get('latency_ms'),
+                event.get('status_code'), event.get('content_type'),
+                event.get('content_length'), event.get('stage'),
+                event.get('extraction_mode'), event.get('quality_score'),
+                event.get('error_type'), event.get('error_message'),
+                event.get('depth'), event.get('retry_count'),
+            )
+            for event in events
+        ]
     )
     database.commit()
+    return len(events)
 
 
 def get_crawl_logs(
@@ -407,6 +500,7 @@ def get_crawl_logs(
     error_only: bool = False,
 ) -> List[dict]:
     """Get crawl logs for a job."""
+    log_writer.flush()
     if error_only:
         rows = database.fetchall(
             """
@@ -431,6 +525,7 @@ def get_crawl_logs(
 
 def get_error_summary(job_id: str) -> dict:
     """Get error summary for a job."""
+    log_writer.flush()
     rows = database.fetchall(
         """
         SELECT error_type, COUNT(*) as count 
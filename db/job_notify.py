@@ -0,0 +1,100 @@
+"""Cross-process job state change notifications.
+
+Uses a Redis channel per job when REDIS_URL is set; otherwise waiters fall
+back to re-reading the job row on the worker poll interval.
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from config import settings
+from db import database
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def _get_client():
+    """Return a shared Redis client, or None when Redis is not configured."""
+    global _client
+    if not HAS_REDIS or not settings.REDIS_URL:
+        return None
+    if _client is None:
+        _client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(settings.REDIS_URL))
+    return _client
+
+
+def _channel(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _current_state(job_id: str) -> str | None:
+    row = database.fetchone("SELECT state FROM jobs WHERE id = ?", (job_id,))
+    return row["state"] if row else None
+
+
+def publish_job_state(job_id: str, state: str) -> None:
+    """Announce a job state change to any waiting API requests."""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        client.publish(_channel(job_id), state)
+    except redis.RedisError as e:
+        logger.debug(f"Could not publish state for job {job_id}: {e}")
+
+
+def _subscribe(job_id: str):
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(_channel(job_id))
+        return pubsub
+    except redis.RedisError as e:
+        logger.debug(f"Could not subscribe to job {job_id}, polling instead: {e}")
+        return None
+
+
+def wait_for_state_change(job_id: str, known_state: str | None, timeout: float) -> str | None:
+    """
+    Block until the job leaves known_state or the timeout elapses.
+
+    Returns:
+        The job's current state, or None if the job no longer exists.
+    """
+    deadline = time.monotonic() + max(0.0, timeout)
+    # Subscribe before reading so a transition between the read and the
+    # subscription is not missed.
+    pubsub = _subscribe(job_id)
+    try:
+        state = _current_state(job_id)
+        while state is not None and state == known_state:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if pubsub is not None:
+                try:
+                    pubsub.get_message(timeout=remaining)
+                except redis.RedisError as e:
+                    logger.debug(f"Lost subscription for job {job_id}, polling instead: {e}")
+                    pubsub = None
+            else:
+                time.sleep(min(settings.WORKER_POLL_INTERVAL_SECONDS, remaining))
+            state = _current_state(job_id)
+        return state
+    finally:
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except redis.RedisError:
+                pass
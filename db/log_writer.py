@@ -0,0 +1,99 @@
+"""Background writer that coalesces crawl_logs inserts.
+
+Events are queued by the crawl threads and written by one daemon thread,
+up to MAX_BATCH_SIZE rows per statement and commit, so logging never waits
+on SQLite's write lock.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from db import database
+
+logger = logging.getLogger(__name__)
+
+CRAWL_LOG_INSERT_SQL = """
+    INSERT INTO crawl_logs (
+        job_id, url, canonical_url, timestamp, latency_ms,
+        status_code, content_type, content_length,
+        stage, extraction_mode, quality_score,
+        error_type, error_message, depth, retry_count
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MAX_BATCH_SIZE = 500
+MAX_BATCH_WAIT_SECONDS = 0.1
+FLUSH_TIMEOUT_SECONDS = 10.0
+
+_rows: queue.Queue = queue.Queue()
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None:
+            atexit.register(flush)
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run, name="crawl-log-writer", daemon=True)
+            _writer.start()
+
+
+def _next_batch() -> list[tuple]:
+    """Block for one row, then take what arrives within the batch window."""
+    batch = [_rows.get()]
+    deadline = time.monotonic() + MAX_BATCH_WAIT_SECONDS
+    while len(batch) < MAX_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_rows.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run() -> None:
+    while True:
+        batch = _next_batch()
+        try:
+            with database.transaction() as conn:
+                conn.executemany(CRAWL_LOG_INSERT_SQL, batch)
+        except Exception as e:
+            # Losing a batch of logs must not stop the writer, or flush() waiters
+            logger.warning(f"Dropped {len(batch)} crawl log events: {e}")
+        finally:
+            for _ in batch:
+                _rows.task_done()
+
+
+def submit(row: tuple) -> None:
+    """Queue one crawl_logs row, in CRAWL_LOG_INSERT_SQL column order."""
+    _ensure_writer()
+    _rows.put(row)
+
+
+def flush(timeout: float = FLUSH_TIMEOUT_SECONDS) -> bool:
+    """
+    Wait until every queued event has been written.
+    
+    Returns False if the writer is gone or the timeout elapsed first.
+    """
+    if _writer is None:
+        return True
+    deadline = time.monotonic() + timeout
+    with _rows.all_tasks_done:
+        while _rows.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not _writer.is_alive():
+                return False
+            _rows.all_tasks_done.wait(min(remaining, MAX_BATCH_WAIT_SECONDS))
+    return True
@@ -29,8 +29,6 @@ CREATE TABLE IF NOT EXISTS url_queue (
     stored_at TEXT
 );
 
-CREATE INDEX IF NOT EXISTS url_queue_job_state_idx ON url_queue(job_id, state);
-CREATE INDEX IF NOT EXISTS url_queue_job_canonical_idx ON url_queue(job_id, canonical_url);
 CREATE INDEX IF NOT EXISTS url_queue_lease_idx ON url_queue(state, lease_expires_at);
 
 -- Document identity: separate doc_id from URL
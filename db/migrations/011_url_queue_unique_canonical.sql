@@ -0,0 +1,5 @@
+-- One queue entry per canonical URL and job, so batch enqueues can rely on
+-- INSERT OR IGNORE instead of probing for each URL first. Rows duplicated
+-- before this index existed are removed once by database.init_db.
+CREATE UNIQUE INDEX IF NOT EXISTS url_queue_job_canonical_uniq_idx ON url_queue(job_id, canonical_url);
+DROP INDEX IF EXISTS url_queue_job_canonical_idx;
@@ -0,0 +1,6 @@
+-- Serve lease_urls' ORDER BY ... LIMIT straight from the index, without a
+-- sort step. It also covers every (job_id, state) lookup, so it replaces
+-- url_queue_job_state_idx.
+CREATE INDEX IF NOT EXISTS url_queue_job_lease_order_idx
+ON url_queue(job_id, state, priority DESC, depth, discovered_at);
+DROP INDEX IF EXISTS url_queue_job_state_idx;
@@ -7,7 +7,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Optional, List
 
 from config.constants import JobState, PageState, EventLevel, EventType
-from db import database
+from db import database, job_notify
 
 
 def _now_iso() -> str:
@@ -165,6 +165,7 @@ def update_job_state(job_id: str, new_state: str, **kwargs) -> dict | None:
     insert_job_event(job_id, EventLevel.INFO, EventType.STATE_CHANGE, {
         "from": old_state, "to": new_state
     })
+    job_notify.publish_job_state(job_id, new_state)
     
     return result
 
@@ -325,42 +326,42 @@ def create_crawl_job(
     expires_at = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
     ignore_prefixes = ignore_path_prefixes or []
 
-    database.execute_query(
-        """
-        INSERT INTO jobs (
-            id, token_hash, start_url, allowed_host, allowed_path_prefix,
-            max_pages, max_depth, timeout_seconds, ignore_path_prefixes,
-            state, cleanup_status, mode, created_at, updated_at,
-            requester_ip_hash, expires_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            job_id,
-            '',
-            start_url,
-            allowed_host,
-            allowed_path_prefix,
-            max_pages,
-            max_depth,
-            timeout_seconds,
-            json.dumps(ignore_prefixes),
-            JobState.QUEUED,
-            'pending',
-            mode,
-            now,
-            now,
-            '',
-            expires_at,
+    # Job row and creation event commit together: one transaction, one fsync.
+    with database.transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO jobs (
+                id, token_hash, start_url, allowed_host, allowed_path_prefix,
+                max_pages, max_depth, timeout_seconds, ignore_path_prefixes,
+                state, cleanup_status, mode, created_at, updated_at,
+                requester_ip_hash, expires_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                job_id,
+                '',
+                start_url,
+                allowed_host,
+                allowed_path_prefix,
+                max_pages,
+                max_depth,
+                timeout_seconds,
+                json.dumps(ignore_prefixes),
+                JobState.QUEUED,
+                'pending',
+                mode,
+                now,
+                now,
+                '',
+                expires_at,
+            )
         )
-    )
-    database.commit()
-
-    insert_job_event(job_id, EventLevel.INFO, 'job_created', {
-        'start_url': start_url,
-        'allowed_path_prefix': allowed_path_prefix,
-        'max_depth': max_depth,
-        'max_pages': max_pages,
-    })
+        _insert_job_event_row(conn, job_id, EventLevel.INFO, 'job_created', {
+            'start_url': start_url,
+            'allowed_path_prefix': allowed_path_prefix,
+            'max_depth': max_depth,
+            'max_pages': max_pages,
+        }, now)
     return get_crawl_job(job_id)
 
 
@@ -369,6 +370,49 @@ def get_crawl_job(job_id: str) -> dict | None:
     return _normalize_job_row(get_job_by_id(job_id))
 
 
+# Active states a job can expire from; queued jobs have not started yet
+_EXPIRABLE_STATES = JobState.ACTIVE - {JobState.QUEUED}
+
+
+def get_crawl_job_expiring(job_id: str) -> dict | None:
+    """Get a crawl job, marking it expired if it has run past `expires_at`.
+
+    The job is read with a plain SELECT, so status polls never take the
+    write lock. Only a started, unfinished job already past `expires_at` is
+    flipped to EXPIRED, by an UPDATE conditional on the state just read.
+    Queued jobs are left alone, as in find_expired_jobs.
+    """
+    job = get_job_by_id(job_id)
+    now = _now_iso()
+    if (
+        not job
+        or job['state'] not in _EXPIRABLE_STATES
+        or not job.get('expires_at')
+        or job['expires_at'] >= now
+    ):
+        return _normalize_job_row(job)
+
+    with database.transaction() as conn:
+        row = conn.execute(
+            """
+            UPDATE jobs
+            SET state = ?, finished_at = COALESCE(finished_at, ?), updated_at = ?
+            WHERE id = ? AND state = ? AND expires_at < ?
+            RETURNING *
+            """,
+            (JobState.EXPIRED, now, now, job_id, job['state'], now),
+        ).fetchone()
+    if row is None:
+        # Another writer moved the job on first; report what it left
+        return get_crawl_job(job_id)
+
+    insert_job_event(job_id, EventLevel.INFO, EventType.STATE_CHANGE, {
+        "from": job['state'], "to": JobState.EXPIRED
+    })
+    job_notify.publish_job_state(job_id, JobState.EXPIRED)
+    return _normalize_job_row(_row_to_dict(row))
+
+
 def delete_crawl_job(job_id: str) -> None:
     """Delete a job and all related records."""
     for table in ("page_links", "pages", "job_events", "job_artifacts"):
@@ -450,6 +494,7 @@ def claim_next_queued_crawl_job() -> dict | None:
         "from": JobState.QUEUED,
         "to": JobState.STARTING,
     })
+    job_notify.publish_job_state(row["id"], JobState.STARTING)
     return get_crawl_job(row["id"])
 
 
@@ -792,6 +837,7 @@ def claim_job_ready_for_finalization() -> dict | None:
             "from": JobState.RUNNING,
             "to": JobState.FINALIZING,
         })
+        job_notify.publish_job_state(row["id"], JobState.FINALIZING)
     return get_crawl_job(row["id"])
 
 
@@ -817,15 +863,13 @@ def reset_inflight_pages(job_id: str) -> None:
     recalculate_job_counts(job_id)
 
 
-def list_pages_for_job(
+def _page_filters(
     job_id: str,
     depth: int | None = None,
     parent_page_id: str | None = None,
     status: str | None = None,
-    limit: int = 100,
-    offset: int = 0,
-) -> list[dict]:
-    """List pages for a job with optional filters."""
+) -> tuple[str, list[Any]]:
+    """Build the WHERE clause shared by the page listing queries."""
     where = ["job_id = ?"]
     params: list[Any] = [job_id]
 
@@ -839,9 +883,22 @@ def list_pages_for_job(
         where.append("status = ?")
         params.append(status)
 
+    return " AND ".join(where), params
+
+
+def list_pages_for_job(
+    job_id: str,
+    depth: int | None = None,
+    parent_page_id: str | None = None,
+    status: str | None = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> list[dict]:
+    """List pages for a job with optional filters."""
+    where, params = _page_filters(job_id, depth, parent_page_id, status)
     query = f"""
         SELECT * FROM pages
-        WHERE {" AND ".join(where)}
+        WHERE {where}
         ORDER BY depth ASC, discovery_order ASC
         LIMIT ? OFFSET ?
     """
@@ -850,6 +907,34 @@ def list_pages_for_job(
     return [_normalize_page_row(_row_to_dict(row)) for row in rows]
 
 
+def list_page_summaries_for_job(
+    job_id: str,
+    depth: int | None = None,
+    parent_page_id: str | None = None,
+    status: str | None = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> list[dict]:
+    """List lightweight page rows without HTML, content, or JSON fields.
+
+    The text length is computed in SQLite so listings never pull page bodies
+    into memory.
+    """
+    where, params = _page_filters(job_id, depth, parent_page_id, status)
+    query = f"""
+        SELECT id, job_id, url, canonical_url, parent_page_id, depth, title,
+               page_type, status, cleanup_score, cleanup_confidence,
+               LENGTH(COALESCE(NULLIF(plain_text, ''), raw_text, '')) AS text_length
+        FROM pages
+        WHERE {where}
+        ORDER BY depth ASC, discovery_order ASC
+        LIMIT ? OFFSET ?
+    """
+    params.extend([limit, offset])
+    rows = database.fetchall(query, tuple(params))
+    return [_row_to_dict(row) for row in rows]
+
+
 def count_pages_for_job(
     job_id: str,
     depth: int | None = None,
@@ -857,21 +942,9 @@ def count_pages_for_job(
     status: str | None = None,
 ) -> int:
     """Count pages for a job with optional filters."""
-    where = ["job_id = ?"]
-    params: list[Any] = [job_id]
-
-    if depth is not None:
-        where.append("depth = ?")
-        params.append(depth)
-    if parent_page_id is not None:
-        where.append("parent_page_id = ?")
-        params.append(parent_page_id)
-    if status:
-        where.append("status = ?")
-        params.append(status)
-
+    where, params = _page_filters(job_id, depth, parent_page_id, status)
     row = database.fetchone(
-        f"SELECT COUNT(*) AS count FROM pages WHERE {' AND '.join(where)}",
+        f"SELECT COUNT(*) AS count FROM pages WHERE {where}",
         tuple(params)
     )
     return row['count'] if row else 0
@@ -910,7 +983,7 @@ def record_page_link(
 
 def get_job_tree(job_id: str) -> dict:
     """Build a tree payload from job pages."""
-    pages = list_pages_for_job(job_id, limit=100000, offset=0)
+    pages = list_page_summaries_for_job(job_id, limit=100000, offset=0)
     nodes = []
     child_map: dict[str, list[str]] = {}
     root_page_id = None
@@ -1047,16 +1120,19 @@ def insert_job_event(
     data: dict | None = None
 ):
     """Insert a job event record."""
-    now = _now_iso()
-    
-    database.execute_query(
+    _insert_job_event_row(database.get_connection(), job_id, level, event, data, _now_iso())
+    database.commit()
+
+
+def _insert_job_event_row(conn, job_id: str, level: str, event: str, data: dict | None, at: str):
+    """Insert a job event on the given connection without committing."""
+    conn.execute(
         """
         INSERT INTO job_events (job_id, at, level, event, data)
         VALUES (?, ?, ?, ?, ?)
         """,
-        (job_id, now, level, event, json.dumps(data) if data else None)
+        (job_id, at, level, event, json.dumps(data) if data else None)
     )
-    database.commit()
 
 
 def get_recent_events(job_id: str, limit: int = 10) -> list[dict]:
@@ -0,0 +1,38 @@
+"""Regression tests for the shared extractor result cache."""
+from __future__ import annotations
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from config import settings
+from crawler.extractors import _cache, plaintext_ext
+from crawler.pipelines import TextExtractionPipeline
+
+_SHORT_PAGE = "<html><head><title>Short</title></head><body><p>Too short to pass.</p></body></html>"
+
+
+class ExtractorCacheTests(TestCase):
+    """Verify each page's HTML is hashed once across the extraction cascade."""
+
+    def setUp(self):
+        patcher = patch.object(settings, "EXTRACTOR_CACHE_SIZE", 16)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _cache.clear_cache()
+        self.addCleanup(_cache.clear_cache)
+
+    def test_cascade_hashes_html_once(self):
+        with patch.object(_cache, "content_digest", wraps=_cache.content_digest) as digest:
+            item = TextExtractionPipeline().process_item({"html": _SHORT_PAGE}, spider=None)
+
+        self.assertEqual(digest.call_count, 1)
+        self.assertEqual(item["title"], "Short")
+
+    def test_calls_without_digest_share_the_cache(self):
+        first = plaintext_ext.extract(_SHORT_PAGE)
+
+        with patch.object(plaintext_ext, "parse_html") as parse:
+            second = plaintext_ext.extract(_SHORT_PAGE, digest=_cache.extraction_digest(_SHORT_PAGE))
+
+        self.assertEqual(second, first)
+        parse.assert_not_called()
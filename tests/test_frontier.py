@@ -0,0 +1,135 @@
+"""Regression tests for the persistent URL queue."""
+from __future__ import annotations
+
+import os
+import tempfile
+from unittest import TestCase
+
+from config import settings
+from db import database, frontier, queries
+
+
+class _FrontierTestCase(TestCase):
+    """Run each test against a fresh SQLite database with one job."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_database_path = settings.DATABASE_PATH
+        database.close_connection()
+        settings.DATABASE_PATH = os.path.join(self.temp_dir.name, "data", "crawler.db")
+        database.init_db()
+        self.addCleanup(self._restore_settings)
+
+        queries.create_crawl_job(
+            job_id="job_queue",
+            start_url="https://example.com/docs",
+            allowed_host="example.com",
+            allowed_path_prefix="/docs",
+            max_depth=2,
+            max_pages=20,
+        )
+        # Seen-URL filters are per process; start and end each test without one
+        frontier.forget_seen_urls("job_queue")
+        self.addCleanup(frontier.forget_seen_urls, "job_queue")
+
+    def _restore_settings(self):
+        database.close_connection()
+        settings.DATABASE_PATH = self.original_database_path
+
+    def _queued_canonicals(self) -> list[str]:
+        rows = database.fetchall(
+            "SELECT canonical_url FROM url_queue WHERE job_id = ? ORDER BY id", ("job_queue",)
+        )
+        return [row["canonical_url"] for row in rows]
+
+
+class EnqueueBatchTests(_FrontierTestCase):
+    """Verify batch enqueues drop duplicates and count only new rows."""
+
+    def test_duplicates_are_dropped_and_not_counted(self):
+        added = frontier.enqueue_urls_batch("job_queue", [
+            ("https://example.com/docs/a", "https://example.com/docs/a", 0, 0),
+            ("https://example.com/docs/b", "https://example.com/docs/b", 1, 0),
+            ("https://example.com/docs/a#top", "https://example.com/docs/a", 1, 0),
+        ])
+        self.assertEqual(added, 2)
+
+        added = frontier.enqueue_urls_batch("job_queue", [
+            ("https://example.com/docs/b", "https://example.com/docs/b", 1, 0),
+            ("https://example.com/docs/c", "https://example.com/docs/c", 1, 0),
+        ])
+        self.assertEqual(added, 1)
+        self.assertEqual(frontier.enqueue_urls_batch("job_queue", []), 0)
+        self.assertEqual(self._queued_canonicals(), [
+            "https://example.com/docs/a",
+            "https://example.com/docs/b",
+            "https://example.com/docs/c",
+        ])
+
+    def test_init_db_removes_duplicates_left_by_older_schemas(self):
+        conn = database.get_connection()
+        conn.executescript(
+            """
+            DROP INDEX url_queue_job_canonical_uniq_idx;
+            INSERT INTO url_queue (job_id, url, canonical_url, discovered_at) VALUES
+                ('job_queue', 'u1', 'https://example.com/docs/a', 't'),
+                ('job_queue', 'u2', 'https://example.com/docs/b', 't'),
+                ('job_queue', 'u3', 'https://example.com/docs/a', 't');
+            """
+        )
+
+        database.init_db()
+        database.init_db()
+
+        self.assertEqual(self._queued_canonicals(), [
+            "https://example.com/docs/a",
+            "https://example.com/docs/b",
+        ])
+        self.assertEqual(
+            frontier.enqueue_urls_batch("job_queue", [("u4", "https://example.com/docs/b", 0, 0)]),
+            0,
+        )
+
+
+class SeenUrlFilterTests(_FrontierTestCase):
+    """Verify the Bloom filter in front of is_url_seen never hides a queued URL."""
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        seen = frontier._BloomFilter(capacity=1000, error_rate=0.01)
+        urls = [f"https://example.com/docs/{index}" for index in range(1000)]
+        for url in urls:
+            seen.add(url)
+
+        self.assertTrue(all(url in seen for url in urls))
+        false_positives = sum(f"https://example.com/other/{index}" in seen for index in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_filter_built_from_existing_rows_sees_them(self):
+        frontier.enqueue_urls_batch("job_queue", [
+            ("https://example.com/docs/a", "https://example.com/docs/a", 0, 0),
+            ("https://example.com/docs/b", "https://example.com/docs/b", 1, 0),
+        ])
+        frontier.forget_seen_urls("job_queue")
+
+        self.assertTrue(frontier.is_url_seen("job_queue", "https://example.com/docs/a"))
+        self.assertTrue(frontier.is_url_seen("job_queue", "https://example.com/docs/b"))
+        self.assertFalse(frontier.is_url_seen("job_queue", "https://example.com/docs/c"))
+
+    def test_enqueued_urls_are_seen_through_the_filter(self):
+        self.assertFalse(frontier.is_url_seen("job_queue", "https://example.com/docs/a"))
+
+        self.assertIsNotNone(frontier.enqueue_url("job_queue", "https://example.com/docs/a", "https://example.com/docs/a"))
+        frontier.enqueue_urls_batch("job_queue", [("https://example.com/docs/b", "https://example.com/docs/b", 1, 0)])
+
+        self.assertIsNone(frontier.enqueue_url("job_queue", "https://example.com/docs/a", "https://example.com/docs/a"))
+        self.assertTrue(frontier.is_url_seen("job_queue", "https://example.com/docs/b"))
+
+    def test_forget_seen_urls_drops_the_job_filter(self):
+        frontier.is_url_seen("job_queue", "https://example.com/docs/a")
+        self.assertIn("job_queue", frontier._seen_filters)
+
+        frontier.forget_seen_urls("job_queue")
+
+        self.assertNotIn("job_queue", frontier._seen_filters)
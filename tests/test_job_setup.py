@@ -0,0 +1,33 @@
+"""Regression tests for new job output directory setup."""
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import Future
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.routes import jobs
+from config import settings
+
+
+class JobSetupTests(TestCase):
+    """Verify job directory setup creates only the job directory and reports failures."""
+
+    def test_prepare_creates_the_job_directory(self):
+        with tempfile.TemporaryDirectory() as output_dir, \
+                patch.object(settings, "JOBS_OUTPUT_DIR", output_dir):
+            jobs._prepare_job_dir("job_setup")
+
+            self.assertEqual(os.listdir(output_dir), ["job_setup"])
+            self.assertEqual(os.listdir(os.path.join(output_dir, "job_setup")), [])
+
+    def test_setup_failure_is_logged(self):
+        future = Future()
+        future.set_exception(PermissionError("read-only file system"))
+
+        with self.assertLogs("api.routes.jobs", level="WARNING") as logs:
+            jobs._log_job_setup_failure("job_setup", future)
+
+        self.assertIn("job_setup", logs.output[0])
+        self.assertIn("read-only file system", logs.output[0])
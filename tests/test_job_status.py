@@ -0,0 +1,201 @@
+"""Regression tests for job status reads."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.app import create_app
+from config import settings
+from config.constants import JobState
+from db import database, job_notify, queries
+
+
+class _DatabaseTestCase(TestCase):
+    """Run each test against a fresh SQLite database."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_database_path = settings.DATABASE_PATH
+        database.close_connection()
+        settings.DATABASE_PATH = os.path.join(self.temp_dir.name, "data", "crawler.db")
+        database.init_db()
+        self.addCleanup(self._restore_settings)
+
+    def _restore_settings(self):
+        database.close_connection()
+        settings.DATABASE_PATH = self.original_database_path
+
+    def _create_job(self, job_id: str, state: str = JobState.QUEUED, **fields) -> dict:
+        queries.create_crawl_job(
+            job_id=job_id,
+            start_url="https://example.com/docs",
+            allowed_host="example.com",
+            allowed_path_prefix="/docs",
+            max_depth=2,
+            max_pages=20,
+        )
+        if state != JobState.QUEUED:
+            fields["state"] = state
+        if fields:
+            queries.update_job(job_id, **fields)
+        return queries.get_crawl_job(job_id)
+
+
+class JobExpiryTests(_DatabaseTestCase):
+    """Verify status reads expire overdue jobs without blocking on writers."""
+
+    def test_read_does_not_wait_for_the_write_lock(self):
+        self._create_job("job_locked", JobState.RUNNING)
+
+        writer = sqlite3.connect(settings.DATABASE_PATH, timeout=0)
+        self.addCleanup(writer.close)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE jobs SET pages_discovered = 5 WHERE id = 'job_locked'")
+        try:
+            job = queries.get_crawl_job_expiring("job_locked")
+        finally:
+            writer.rollback()
+
+        self.assertEqual(job["status"], JobState.RUNNING)
+
+    def test_overdue_running_job_expires_with_its_prior_state(self):
+        self._create_job("job_overdue", JobState.RUNNING, expires_at="2000-01-01T00:00:00+00:00")
+
+        job = queries.get_crawl_job_expiring("job_overdue")
+
+        self.assertEqual(job["status"], JobState.EXPIRED)
+        self.assertIsNotNone(job["finished_at"])
+        event = queries.get_recent_events("job_overdue", limit=1)[0]
+        self.assertEqual(json.loads(event["data"]), {"from": JobState.RUNNING, "to": JobState.EXPIRED})
+
+    def test_overdue_queued_job_is_left_queued(self):
+        self._create_job("job_queued", expires_at="2000-01-01T00:00:00+00:00")
+
+        job = queries.get_crawl_job_expiring("job_queued")
+
+        self.assertEqual(job["status"], JobState.QUEUED)
+
+    def test_missing_job_returns_none(self):
+        self.assertIsNone(queries.get_crawl_job_expiring("job_missing"))
+
+
+class JobStatusWaitTests(_DatabaseTestCase):
+    """Verify long-poll and event-stream status reads without Redis."""
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (
+            ("REDIS_URL", ""),
+            ("WORKER_POLL_INTERVAL_SECONDS", 0.05),
+            ("JOB_EVENTS_HEARTBEAT_SECONDS", 0.2),
+            ("JOB_EVENTS_MAX_STREAM_SECONDS", 10),
+        ):
+            patcher = patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = create_app().test_client()
+
+    def _finish_job_later(self, job_id: str, delay: float = 0.3) -> None:
+        def finish():
+            queries.update_crawl_job_status(job_id, JobState.DONE)
+            database.close_connection()
+
+        timer = threading.Timer(delay, finish)
+        timer.start()
+        self.addCleanup(timer.join)
+
+    def test_wait_falls_back_to_polling_the_job_row(self):
+        self._create_job("job_poll", JobState.RUNNING)
+        self.assertIsNone(job_notify._get_client())
+
+        self.assertEqual(job_notify.wait_for_state_change("job_poll", JobState.RUNNING, 0.2), JobState.RUNNING)
+
+        self._finish_job_later("job_poll")
+        started = time.monotonic()
+        state = job_notify.wait_for_state_change("job_poll", JobState.RUNNING, 5)
+
+        self.assertEqual(state, JobState.DONE)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_long_poll_returns_on_transition(self):
+        self._create_job("job_long_poll", JobState.RUNNING)
+        self._finish_job_later("job_long_poll")
+
+        started = time.monotonic()
+        response = self.client.get("/v1/jobs/job_long_poll?wait=5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], JobState.DONE)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_event_stream_closes_on_terminal_state(self):
+        self._create_job("job_stream", JobState.RUNNING)
+        self._finish_job_later("job_stream")
+
+        started = time.monotonic()
+        response = self.client.get("/v1/jobs/job_stream/events")
+        body = response.get_data(as_text=True)
+
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])["status"]
+            for line in body.splitlines()
+            if line.startswith("data: ")
+        ]
+        self.assertEqual(events, [JobState.RUNNING, JobState.DONE])
+        self.assertLess(time.monotonic() - started, settings.JOB_EVENTS_MAX_STREAM_SECONDS)
+
+
+class JobStatusEtagTests(_DatabaseTestCase):
+    """Verify unchanged job status polls are answered with 304."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = create_app().test_client()
+
+    def test_unchanged_job_returns_304(self):
+        self._create_job(
+            "job_etag",
+            JobState.DONE,
+            started_at="2024-01-01T00:00:00+00:00",
+            finished_at="2024-01-01T00:05:00+00:00",
+        )
+        first = self.client.get("/v1/jobs/job_etag")
+        etag = first.headers["ETag"]
+
+        second = self.client.get("/v1/jobs/job_etag", headers={"If-None-Match": etag})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()["elapsed_seconds"], 300)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["ETag"], etag)
+        self.assertEqual(second.get_data(), b"")
+
+    def test_counter_change_returns_200_with_new_etag(self):
+        self._create_job("job_etag_progress")
+        etag = self.client.get("/v1/jobs/job_etag_progress").headers["ETag"]
+        queries.update_job("job_etag_progress", pages_discovered=3)
+
+        response = self.client.get("/v1/jobs/job_etag_progress", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["pages_discovered"], 3)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_started_job_is_not_cacheable(self):
+        self._create_job("job_running", JobState.RUNNING, started_at="2024-01-01T00:00:00+00:00")
+
+        response = self.client.get("/v1/jobs/job_running", headers={"If-None-Match": "*"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response.headers)
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertGreater(response.get_json()["elapsed_seconds"], 0)
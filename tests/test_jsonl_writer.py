@@ -0,0 +1,61 @@
+"""Regression tests for the background JSONL output writer."""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from config import settings
+from crawler.pipelines import JSONLWriterPipeline
+
+
+class _BrokenFile:
+    def write(self, data):
+        raise ValueError("I/O operation on closed file.")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JSONLWriterPipelineTests(TestCase):
+    """Verify a failing writer thread fails items instead of blocking."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        patcher = patch.object(settings, "JOBS_OUTPUT_DIR", self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.spider = SimpleNamespace(job_id="job_jsonl")
+        self.pipeline = JSONLWriterPipeline()
+        self.pipeline.open_spider(self.spider)
+
+    def test_items_are_written_on_close(self):
+        for i in range(3):
+            self.pipeline.process_item({"url": f"https://example.com/{i}"}, self.spider)
+        self.pipeline.close_spider(self.spider)
+
+        with open(os.path.join(self.temp_dir.name, "job_jsonl", "pages.raw.jsonl"), "rb") as f:
+            urls = [json.loads(line)["url"] for line in f]
+        self.assertEqual(urls, [f"https://example.com/{i}" for i in range(3)])
+
+    def test_write_failure_fails_later_items(self):
+        real_file = self.pipeline.file
+        self.addCleanup(real_file.close)
+        self.pipeline.file = _BrokenFile()
+
+        self.pipeline.process_item({"url": "https://example.com/a"}, self.spider)
+        self.pipeline.writer.join(timeout=5)
+
+        self.assertFalse(self.pipeline.writer.is_alive())
+        self.assertIsInstance(self.pipeline.write_error, ValueError)
+        with self.assertRaises(OSError):
+            self.pipeline.process_item({"url": "https://example.com/b"}, self.spider)
+        self.pipeline.close_spider(self.spider)
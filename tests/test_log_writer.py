@@ -0,0 +1,91 @@
+"""Regression tests for the background crawl log writer."""
+from __future__ import annotations
+
+import os
+import queue
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from config import settings
+from db import database, frontier, log_writer, queries
+
+
+class CrawlLogWriterTests(TestCase):
+    """Verify queued crawl events are written and flush() never wedges."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_database_path = settings.DATABASE_PATH
+        database.close_connection()
+        settings.DATABASE_PATH = os.path.join(self.temp_dir.name, "data", "crawler.db")
+        database.init_db()
+        self.addCleanup(self._restore_settings)
+
+        # A fresh queue and writer thread, so the writer opens this test's database
+        for name, value in (("_rows", queue.Queue()), ("_writer", None)):
+            patcher = patch.object(log_writer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        queries.create_crawl_job(
+            job_id="job_logs",
+            start_url="https://example.com/docs",
+            allowed_host="example.com",
+            allowed_path_prefix="/docs",
+            max_depth=2,
+            max_pages=20,
+        )
+
+    def _restore_settings(self):
+        database.close_connection()
+        settings.DATABASE_PATH = self.original_database_path
+
+    def test_queued_events_are_readable_after_flush(self):
+        for index in range(3):
+            frontier.log_crawl_event("job_logs", f"https://example.com/docs/{index}", status_code=200)
+
+        self.assertTrue(log_writer.flush())
+        logs = frontier.get_crawl_logs("job_logs")
+
+        self.assertEqual(len(logs), 3)
+        self.assertEqual({log["status_code"] for log in logs}, {200})
+
+    def test_failing_batch_does_not_wedge_flush(self):
+        real_transaction = database.transaction
+        calls = []
+
+        def failing_once():
+            calls.append(None)
+            if len(calls) == 1:
+                raise OSError("disk unavailable")
+            return real_transaction()
+
+        with patch.object(database, "transaction", side_effect=failing_once):
+            frontier.log_crawl_event("job_logs", "https://example.com/docs/lost")
+            self.assertTrue(log_writer.flush(timeout=5))
+
+            frontier.log_crawl_event("job_logs", "https://example.com/docs/kept")
+            self.assertTrue(log_writer.flush(timeout=5))
+
+        self.assertTrue(log_writer._writer.is_alive())
+        self.assertEqual(
+            [log["url"] for log in frontier.get_crawl_logs("job_logs")],
+            ["https://example.com/docs/kept"],
+        )
+
+    def test_flush_returns_when_the_writer_is_gone(self):
+        dead_writer = threading.Thread(target=lambda: None)
+        dead_writer.start()
+        dead_writer.join()
+        log_writer._rows.put(("job_logs",) + (None,) * 14)
+
+        with patch.object(log_writer, "_writer", dead_writer):
+            started = time.monotonic()
+            self.assertFalse(log_writer.flush(timeout=5))
+
+        self.assertLess(time.monotonic() - started, 1)
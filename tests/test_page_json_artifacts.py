@@ -226,3 +226,70 @@ class PageJsonArtifactTests(TestCase):
             "Bagaimana Cara Mengelola User Input dan Bot Response pada Chatbot",
         )
         self.assertNotEqual(records[page["id"]]["title"], "Online Help Center | Layanan Bantuan - Mekari Qontak")
+
+
+class ArtifactDownloadTests(TestCase):
+    """Verify artifact downloads keep Range and validator support."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_database_path = settings.DATABASE_PATH
+        self.original_jobs_output_dir = settings.JOBS_OUTPUT_DIR
+
+        database.close_connection()
+        settings.DATABASE_PATH = os.path.join(self.temp_dir.name, "data", "crawler.db")
+        settings.JOBS_OUTPUT_DIR = os.path.join(self.temp_dir.name, "out", "jobs")
+        database.init_db()
+        self.addCleanup(self._restore_settings)
+
+        queries.create_crawl_job(
+            job_id="job_artifact",
+            start_url="https://example.com/docs",
+            allowed_host="example.com",
+            allowed_path_prefix="/docs",
+            max_depth=2,
+            max_pages=20,
+        )
+        queries.update_crawl_job_status("job_artifact", JobState.DONE)
+        job_dir = os.path.join(settings.JOBS_OUTPUT_DIR, "job_artifact")
+        os.makedirs(job_dir, exist_ok=True)
+        self.path = os.path.join(job_dir, "pages.jsonl")
+        with open(self.path, "wb") as f:
+            f.write(b"0123456789")
+        queries.create_artifact("job_artifact", ArtifactKind.PAGES_JSONL, self.path, 10)
+        self.url = f"/v1/jobs/job_artifact/artifacts/{ArtifactKind.PAGES_JSONL}/download"
+        self.client = create_app().test_client()
+
+    def _restore_settings(self):
+        database.close_connection()
+        settings.DATABASE_PATH = self.original_database_path
+        settings.JOBS_OUTPUT_DIR = self.original_jobs_output_dir
+
+    def test_range_request_returns_partial_content(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=2-5"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, b"2345")
+        self.assertEqual(response.headers["Content-Range"], "bytes 2-5/10")
+        response.close()
+
+    def test_full_download_has_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b"0123456789")
+        self.assertEqual(response.content_length, 10)
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+        self.assertIsNotNone(response.last_modified)
+        self.assertIn("ETag", response.headers)
+        response.close()
+
+    def test_xaccel_redirect_skips_opening_the_file(self):
+        with patch.object(settings, "USE_XACCEL", True), patch("builtins.open") as opened:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["X-Accel-Redirect"].endswith("/job_artifact/pages.jsonl"))
+        opened.assert_not_called()
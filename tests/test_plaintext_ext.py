@@ -0,0 +1,28 @@
+"""Regression tests for the plain text fallback extractor."""
+from __future__ import annotations
+
+from unittest import TestCase
+
+from crawler.extractors import plaintext_ext
+
+
+class PlaintextExtractorTests(TestCase):
+    """Verify unrendered markup stays out of fallback text and titles."""
+
+    def test_template_content_is_not_extracted(self):
+        html = "<html><body><p>Shown<template><p>Hidden</p></template> text</p></body></html>"
+
+        self.assertEqual(plaintext_ext.extract(html), "Shown text")
+
+    def test_h1_title_skips_script_style_and_template_text(self):
+        html = (
+            "<html><body><h1>Getting <script>track()</script><style>h1{}</style>"
+            "<template>draft</template><b> started </b></h1></body></html>"
+        )
+
+        self.assertEqual(plaintext_ext.get_title(html), "Gettingstarted")
+
+    def test_h1_inside_template_has_empty_title(self):
+        html = "<html><body><template><h1>Draft</h1></template><h1>Live</h1></body></html>"
+
+        self.assertEqual(plaintext_ext.get_title(html), "")
@@ -0,0 +1,90 @@
+"""Regression tests for the Playwright crawl workers."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from config import settings
+from crawler.playwright_crawler import PlaywrightCrawler
+
+
+class _FakePage:
+    def __init__(self, fail_goto: bool = False):
+        self.fail_goto = fail_goto
+        self.closed = False
+        self.urls: list[str] = []
+
+    async def goto(self, url, **kwargs):
+        self.urls.append(url)
+        if self.fail_goto:
+            raise RuntimeError("Target crashed")
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeContext:
+    def __init__(self, pages: list):
+        self.pages = list(pages)
+        self.opened: list = []
+
+    async def new_page(self):
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        self.opened.append(page)
+        return page
+
+
+class PlaywrightWorkerTests(TestCase):
+    """Verify worker failures cannot leave the crawl waiting forever."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        patcher = patch.object(settings, "PLAYWRIGHT_CRAWL_CONCURRENCY", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.crawler = PlaywrightCrawler(
+            job_id="job_pw",
+            start_url="https://example.com/docs",
+            allowed_host="example.com",
+            output_dir=self.temp_dir.name,
+        )
+        self.crawler.start_time = time.time()
+
+    def _drain(self, context: _FakeContext, urls: list[str]):
+        async def run():
+            original = self.crawler._enqueue
+
+            def enqueue(frontier, url, depth):
+                for queued in urls:
+                    original(frontier, queued, depth)
+
+            with patch.object(self.crawler, "_enqueue", enqueue):
+                await asyncio.wait_for(self.crawler._drain_frontier(context), timeout=5)
+
+        asyncio.run(run())
+
+    def test_new_page_failures_do_not_hang_the_crawl(self):
+        urls = [f"https://example.com/docs/{i}" for i in range(5)]
+        context = _FakeContext([RuntimeError("Browser closed")] * len(urls))
+
+        self._drain(context, urls)
+
+        self.assertEqual(len(self.crawler.errors), len(urls))
+
+    def test_failed_navigation_replaces_the_page(self):
+        crashed = _FakePage(fail_goto=True)
+        fresh = _FakePage()
+        context = _FakeContext([crashed, fresh, _FakePage()])
+        with patch.object(settings, "PLAYWRIGHT_CRAWL_CONCURRENCY", 1):
+            self._drain(context, ["https://example.com/docs/a", "https://example.com/docs/b"])
+
+        self.assertTrue(crashed.closed)
+        self.assertEqual(crashed.urls, ["https://example.com/docs/a"])
+        self.assertEqual(fresh.urls, ["https://example.com/docs/b"])
@@ -0,0 +1,79 @@
+"""Regression tests for the per-IP job creation limit."""
+from __future__ import annotations
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from api.app import create_app
+from api.middleware import rate_limit
+from config import settings
+from db import database
+
+
+class JobCreationRateLimitTests(TestCase):
+    """Verify job creation is limited per IP by the in-process window."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_database_path = settings.DATABASE_PATH
+        self.original_jobs_output_dir = settings.JOBS_OUTPUT_DIR
+        database.close_connection()
+        settings.DATABASE_PATH = os.path.join(self.temp_dir.name, "data", "crawler.db")
+        settings.JOBS_OUTPUT_DIR = os.path.join(self.temp_dir.name, "out", "jobs")
+        self.addCleanup(self._restore_settings)
+
+        for name, value in (
+            ("REDIS_URL", ""),
+            ("USE_LOCAL_RATELIMIT", True),
+            ("JOB_CREATIONS_PER_IP", 2),
+            ("RATE_LIMIT_WINDOW_SECONDS", 3600),
+        ):
+            patcher = patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rate_limit._local_windows.clear()
+        self.addCleanup(rate_limit._local_windows.clear)
+        self.client = create_app().test_client()
+
+    def _restore_settings(self):
+        database.close_connection()
+        settings.DATABASE_PATH = self.original_database_path
+        settings.JOBS_OUTPUT_DIR = self.original_jobs_output_dir
+
+    def _create(self, start_url: str = "https://example.com/docs", ip: str = "203.0.113.7"):
+        return self.client.post(
+            "/v1/jobs",
+            json={"start_url": start_url},
+            headers={"X-Forwarded-For": ip},
+        )
+
+    def test_rejects_creations_past_the_window_limit(self):
+        self.assertEqual(self._create().status_code, 201)
+        self.assertEqual(self._create().status_code, 201)
+
+        response = self._create()
+
+        self.assertEqual(response.status_code, 429)
+        body = response.get_json()
+        self.assertEqual(body["message"], "Maximum 2 new jobs per 3600 seconds allowed per IP")
+        self.assertEqual(body["current_jobs"], 2)
+        self.assertEqual(self._create(ip="198.51.100.9").status_code, 201)
+
+    def test_invalid_requests_do_not_use_quota(self):
+        for _ in range(3):
+            self.assertEqual(self._create(start_url="not a url").status_code, 400)
+
+        self.assertEqual(self._create().status_code, 201)
+        self.assertEqual(self._create().status_code, 201)
+
+    def test_no_window_backend_allows_without_querying_storage(self):
+        with patch.object(settings, "USE_LOCAL_RATELIMIT", False), \
+                patch("db.queries.get_ip_concurrent_count") as count:
+            for _ in range(3):
+                self.assertEqual(self._create().status_code, 201)
+
+        count.assert_not_called()
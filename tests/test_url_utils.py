@@ -0,0 +1,62 @@
+"""Regression tests pinning the canonical URL form used as the dedup key."""
+from __future__ import annotations
+
+from unittest import TestCase
+
+from crawler.url_utils import canonicalize_url, strip_tracking_params
+
+
+# (input, canonicalize_url, strip_tracking_params). Query params other than
+# tracking params are kept verbatim: no re-encoding, no reordering.
+URL_CASES = [
+    # Encodings of a space are not unified
+    ("https://example.com/a?q=%20a", "https://example.com/a?q=%20a", "https://example.com/a?q=%20a"),
+    ("https://example.com/a?q=+a", "https://example.com/a?q=+a", "https://example.com/a?q=+a"),
+    # Valueless params keep their shape
+    ("https://example.com/a?k", "https://example.com/a?k", "https://example.com/a?k"),
+    # Non-ASCII keys are not percent-encoded
+    ("https://example.com/a?ключ=1", "https://example.com/a?ключ=1", "https://example.com/a?ключ=1"),
+    # Tracking names are matched as written, not percent-decoded
+    (
+        "https://example.com/a?%75tm_source=x&a=1",
+        "https://example.com/a?%75tm_source=x&a=1",
+        "https://example.com/a?%75tm_source=x&a=1",
+    ),
+    # Tracking names match case-insensitively
+    ("https://example.com/a?UTM_SOURCE=x&b=1", "https://example.com/a?b=1", "https://example.com/a?b=1"),
+    # Only canonicalize_url lowercases the scheme and host
+    ("HTTPS://Example.COM/a?utm_source=x&b=1", "https://example.com/a?b=1", "HTTPS://Example.COM/a?b=1"),
+    # Repeated keys and param order are preserved
+    ("https://example.com/a?a=1&b=2&a=3", "https://example.com/a?a=1&b=2&a=3", "https://example.com/a?a=1&b=2&a=3"),
+    ("https://example.com/a?b=2&a=1", "https://example.com/a?b=2&a=1", "https://example.com/a?b=2&a=1"),
+    # A query of only tracking params disappears, with the fragment
+    ("https://example.com/a?utm_source=x&fbclid=y#top", "https://example.com/a", "https://example.com/a"),
+    # Without a query the URL is left as is, fragment included
+    ("https://example.com/a#top", "https://example.com/a", "https://example.com/a#top"),
+    # Default ports, trailing slashes, index pages, doubled slashes, path params
+    ("https://Example.com:443/docs//guide/?x=1#f", "https://example.com/docs/guide?x=1", "https://Example.com:443/docs//guide/?x=1"),
+    ("http://example.com:80/docs/index.html", "http://example.com/docs", "http://example.com:80/docs/index.html"),
+    ("https://example.com:8443/", "https://example.com:8443/", "https://example.com:8443/"),
+    ("https://example.com/a;jsessionid=1?b=2", "https://example.com/a?b=2", "https://example.com/a;jsessionid=1?b=2"),
+    ("https://example.com", "https://example.com/", "https://example.com"),
+]
+
+
+class CanonicalUrlTests(TestCase):
+    """Verify the canonical URL contract cannot drift silently."""
+
+    def test_canonicalize_url(self):
+        for url, canonical, _ in URL_CASES:
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), canonical)
+
+    def test_strip_tracking_params(self):
+        for url, _, stripped in URL_CASES:
+            with self.subTest(url=url):
+                self.assertEqual(strip_tracking_params(url), stripped)
+
+    def test_equivalent_urls_share_a_canonical_form(self):
+        self.assertEqual(
+            canonicalize_url("HTTPS://Example.com:443/docs/guide/index.html?utm_campaign=x"),
+            canonicalize_url("https://example.com/docs/guide#intro"),
+        )
@@ -12,8 +12,8 @@ from crawler.crawl4ai_session import Crawl4AIPageSession
 from crawler.openapi_extractor import convert_spec_to_markdown, detect_openapi_spec_url, fetch_openapi_spec
 from crawler.sitemap import discover_sitemap_urls
 from crawler.text_utils import markdown_to_text
-from crawler.url_utils import canonicalize_url, get_path
-from db import queries
+from crawler.url_utils import canonicalize_url, clear_url_caches, get_path
+from db import frontier, queries
 from worker.finalizer import finalize_job
 
 
@@ -87,6 +87,10 @@ def finalize_ready_job() -> bool:
         if job["status"] == JobState.FINALIZING:
             queries.update_crawl_job_status(job["id"], JobState.FAILED, cleanup_status="failed")
         return False
+    finally:
+        # The finished job's URLs will not be seen again
+        clear_url_caches()
+        frontier.forget_seen_urls(job["id"])
 
 
 def _prepare_job(job: dict) -> dict: